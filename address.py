@@ -0,0 +1,114 @@
+import re
+import textwrap
+
+import pandas as pd
+
+# -----------------------------------------------------------------------------
+# 주소 정규화 (시/도, 시/군/구, 나머지)
+# -----------------------------------------------------------------------------
+# Short and former names -> current official 시/도 name
+SIDO_NAMES = {
+    '서울특별시': '서울특별시', '서울시': '서울특별시', '서울': '서울특별시',
+    '부산광역시': '부산광역시', '부산시': '부산광역시', '부산': '부산광역시',
+    '대구광역시': '대구광역시', '대구시': '대구광역시', '대구': '대구광역시',
+    '인천광역시': '인천광역시', '인천시': '인천광역시', '인천': '인천광역시',
+    '광주광역시': '광주광역시', '광주': '광주광역시',
+    '대전광역시': '대전광역시', '대전시': '대전광역시', '대전': '대전광역시',
+    '울산광역시': '울산광역시', '울산시': '울산광역시', '울산': '울산광역시',
+    '세종특별자치시': '세종특별자치시', '세종시': '세종특별자치시', '세종': '세종특별자치시',
+    '경기도': '경기도', '경기': '경기도',
+    '강원특별자치도': '강원특별자치도', '강원도': '강원특별자치도', '강원': '강원특별자치도',
+    '충청북도': '충청북도', '충북': '충청북도',
+    '충청남도': '충청남도', '충남': '충청남도',
+    '전북특별자치도': '전북특별자치도', '전라북도': '전북특별자치도', '전북': '전북특별자치도',
+    '전라남도': '전라남도', '전남': '전라남도',
+    '경상북도': '경상북도', '경북': '경상북도',
+    '경상남도': '경상남도', '경남': '경상남도',
+    '제주특별자치도': '제주특별자치도', '제주도': '제주특별자치도', '제주': '제주특별자치도',
+}
+# Note: '광주시' is a city in 경기도, so it is deliberately not a 시/도 alias
+
+# Country prefixes Google puts in front of addresses ("KR, ...", "대한민국 ...")
+PREFIX_RE = re.compile(r'^(?:KR|South Korea|대한민국)(?:\s*,\s*|\s+)')
+# Longest names first so "제주특별자치도" wins over "제주"
+_SIDO_ALT = '|'.join(sorted(map(re.escape, SIDO_NAMES), key=len, reverse=True))
+ADDRESS_RE = re.compile(
+    rf'^(?:(?P<sido>{_SIDO_ALT})(?:\s+|$))?'
+    r'(?:(?P<sigungu>\S+?[시군구](?:\s+\S+?구)?)(?:\s+|$))?'
+    r'(?P<rest>.*)$'
+)
+_SPACES_RE = re.compile(r'\s+')
+
+COMPONENT_COLUMNS = ['시도', '시군구', '상세주소', '주소키', '주소1', '주소2']
+LINE_WIDTH = 25
+
+
+def clean(address) -> str:
+    if address is None or (isinstance(address, float) and pd.isna(address)):
+        return ''
+    address = _SPACES_RE.sub(' ', str(address)).strip()
+    return PREFIX_RE.sub('', address).rstrip('/').strip()
+
+
+def _key(sido: str, sigungu: str, rest: str) -> str:
+    # Canonical form for dedup and cache keys: official 시/도 name, no spaces
+    return f"{sido}|{sigungu}|{rest}".replace(' ', '').lower()
+
+
+def _lines(sido: str, sigungu: str, rest: str, address: str):
+    # Two short display lines for the recommendation cards
+    line1 = ' '.join(p for p in (sido, sigungu) if p)
+    line2 = rest
+    if not line1:
+        parts = address.split(' ', 1)
+        line1, line2 = parts[0], parts[1] if len(parts) > 1 else ''
+    return (
+        textwrap.shorten(line1, width=LINE_WIDTH, placeholder='…'),
+        textwrap.shorten(line2, width=LINE_WIDTH, placeholder='…'),
+    )
+
+
+def parse(address) -> dict:
+
+    address = clean(address)
+    m = ADDRESS_RE.match(address)
+    sido = SIDO_NAMES.get(m['sido'], '') if m['sido'] else ''
+    sigungu = m['sigungu'] or ''
+    rest = m['rest'].strip()
+    line1, line2 = _lines(m['sido'] or '', sigungu, rest, address)
+    return {
+        '시도': sido,
+        '시군구': sigungu,
+        '상세주소': rest,
+        '주소키': _key(sido, sigungu, rest),
+        '주소1': line1,
+        '주소2': line2,
+    }
+
+
+def canonical_key(address) -> str:
+    return parse(address)['주소키']
+
+
+def add_address_components(df: pd.DataFrame, col: str = '주소') -> pd.DataFrame:
+
+    # One vectorised regex pass over the column; results live next to the data
+    cleaned = (df[col].astype(str).str.replace(_SPACES_RE, ' ', regex=True).str.strip()
+               .str.replace(PREFIX_RE, '', regex=True).str.rstrip('/').str.strip())
+    parts = cleaned.str.extract(ADDRESS_RE).fillna('')
+    sido = parts['sido'].map(SIDO_NAMES).fillna('')
+    rest = parts['rest'].str.strip()
+    keys = (sido + '|' + parts['sigungu'] + '|' + rest).str.replace(' ', '', regex=False).str.lower()
+    lines = [
+        _lines(s, g, r, a)
+        for s, g, r, a in zip(parts['sido'], parts['sigungu'], rest, cleaned)
+    ]
+    return df.assign(**{
+        col: cleaned,
+        '시도': sido,
+        '시군구': parts['sigungu'],
+        '상세주소': rest,
+        '주소키': keys,
+        '주소1': [l1 for l1, _ in lines],
+        '주소2': [l2 for _, l2 in lines],
+    })
@@ -0,0 +1,289 @@
+import json
+import asyncio
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from aiohttp import web
+
+from api_usage import usage
+from tour_core import (
+    google_key, search_all_places, get_lat_lng, load_restaurants,
+)
+import records
+import ranking
+import autocomplete
+import density_tiles
+from config import env
+
+# -----------------------------------------------------------------------------
+# 관광지/맛집 추천 JSON API (python api_server.py --port 8080)
+# -----------------------------------------------------------------------------
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+# Upstream calls are blocking; they run on this many threads
+API_WORKERS = int(env("API_WORKERS", "32"))
+# Clients may reuse a response for this long before revalidating with the ETag
+CACHE_MAX_AGE = int(env("API_CACHE_MAX_AGE", "60"))
+# Numbers each request's usage scope
+_request_ids = itertools.count(1)
+
+
+class BadRequest(web.HTTPBadRequest):
+
+    def __init__(self, message: str):
+        super().__init__(
+            text=json.dumps({'error': message}, ensure_ascii=False),
+            content_type='application/json',
+        )
+
+
+# -----------------------------------------------------------------------------
+# 응답 변환
+# -----------------------------------------------------------------------------
+def attraction_record(place) -> dict:
+    return place.as_dict()
+
+
+def restaurant_records(df: pd.DataFrame) -> list:
+    df = df.rename(columns={'photo_ref': 'photo_reference'})
+    # to_json maps NaN to null, which json.dumps on the dicts would not
+    return json.loads(df.to_json(orient='records', force_ascii=False))
+
+
+def paginate(items: list, request: web.Request) -> dict:
+    page = _int_param(request, 'page', 1, minimum=1)
+    page_size = _int_param(request, 'page_size', DEFAULT_PAGE_SIZE, minimum=1, maximum=MAX_PAGE_SIZE)
+    start = (page - 1) * page_size
+    return {
+        'total': len(items),
+        'page': page,
+        'page_size': page_size,
+        'has_next': start + page_size < len(items),
+        'items': items[start:start + page_size],
+    }
+
+
+def _int_param(request: web.Request, name: str, default: int, minimum: int = None, maximum: int = None) -> int:
+    raw = request.query.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an integer")
+    if minimum is not None and value < minimum:
+        raise BadRequest(f"'{name}' must be >= {minimum}")
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def _float_param(request: web.Request, name: str) -> float:
+    try:
+        return float(request.query[name])
+    except KeyError:
+        raise BadRequest(f"'{name}' is required")
+    except ValueError:
+        raise BadRequest(f"'{name}' must be a number")
+
+
+def json_response(request: web.Request, payload) -> web.Response:
+
+    # Strong ETag over the serialized body; matching If-None-Match gets a 304
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+    headers = {'ETag': etag, 'Cache-Control': f'public, max-age={CACHE_MAX_AGE}'}
+    if etag in [t.strip() for t in request.headers.get('If-None-Match', '').split(',')]:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type='application/json', charset='utf-8', headers=headers)
+
+
+# -----------------------------------------------------------------------------
+# 핸들러
+# -----------------------------------------------------------------------------
+@web.middleware
+async def usage_scope(request: web.Request, handler):
+
+    # Each request is its own budget scope: clients behind one load balancer
+    # share request.remote, so a per-client budget would starve them all once
+    # spent. The daily budget still caps the process; counters go with the request.
+    client = request.headers.get('X-Client-Id') or request.remote or 'unknown'
+    session_id = f"api:{client}:{next(_request_ids)}"
+    usage.begin_rerun(session_id)
+    try:
+        return await handler(request)
+    finally:
+        usage.end_session(session_id)
+
+
+async def attractions(request: web.Request) -> web.Response:
+    query = request.query.get('query', '').strip()
+    if not query:
+        raise BadRequest("'query' is required")
+    # asyncio.to_thread copies the context, so usage accounting follows the call
+    places = await asyncio.to_thread(search_all_places, query, google_key)
+    k = _int_param(request, 'k', 5, minimum=1, maximum=20)
+    payload = paginate([attraction_record(p) for p in places], request)
+    payload['query'] = query
+    payload['top'] = [attraction_record(p) for p in records.rank_records(places, k)]
+    return json_response(request, payload)
+
+
+async def restaurants(request: web.Request) -> web.Response:
+    if 'address' in request.query:
+        lat, lng = await asyncio.to_thread(get_lat_lng, request.query['address'], google_key)
+        if lat is None:
+            raise web.HTTPNotFound(text=json.dumps({'error': 'address not found'}), content_type='application/json')
+    else:
+        lat, lng = _float_param(request, 'lat'), _float_param(request, 'lng')
+    df = await asyncio.to_thread(load_restaurants, lat, lng, google_key)
+    k = _int_param(request, 'k', 5, minimum=1, maximum=20)
+    rows = restaurant_records(df)
+    payload = paginate(rows, request)
+    payload['location'] = {'lat': lat, 'lng': lng}
+    # load_restaurants() keeps the table ordered by weighted score
+    payload['top'] = rows[:k]
+    return json_response(request, payload)
+
+
+async def recommendations(request: web.Request) -> web.Response:
+
+    # search -> chosen attraction -> nearby -> top-k, in one round-trip
+    query = request.query.get('query', '').strip()
+    if not query:
+        raise BadRequest("'query' is required")
+    k = _int_param(request, 'k', 5, minimum=1, maximum=20)
+    places = await asyncio.to_thread(search_all_places, query, google_key)
+    wanted = request.query.get('attraction')
+    if wanted:
+        place = next((p for p in places if wanted in (p.place_id, p.name)), None)
+    else:
+        top = records.rank_records(places, 1)
+        place = top[0] if top else None
+    if place is None:
+        raise web.HTTPNotFound(text=json.dumps({'error': 'attraction not found'}), content_type='application/json')
+    record = attraction_record(place)
+    if record['lat'] is None:
+        record['lat'], record['lng'] = await asyncio.to_thread(get_lat_lng, record['address'], google_key)
+    df = await asyncio.to_thread(load_restaurants, record['lat'], record['lng'], google_key)
+    return json_response(request, {
+        'query': query,
+        'attraction': record,
+        'top_attractions': [attraction_record(p) for p in records.rank_records(places, k)],
+        'top_restaurants': restaurant_records(df.head(k)),
+    })
+
+
+async def suggest(request: web.Request) -> web.Response:
+
+    # Local index only (no upstream calls), cheap enough to call per keystroke
+    query = request.query.get('q', '')
+    k = _int_param(request, 'k', autocomplete.DEFAULT_LIMIT, minimum=1, maximum=20)
+    index = autocomplete.current_index()
+    hit = index.resolve(query)
+    return json_response(request, {
+        'query': query,
+        'exact': hit.as_dict() if hit is not None else None,
+        'suggestions': [entry.as_dict() for entry in index.suggest(query, k)],
+    })
+
+
+async def density(request: web.Request) -> web.Response:
+
+    # Pre-aggregated restaurant tiles for the viewport; bbox=south,west,north,east
+    zoom = _float_param(request, 'zoom')
+    bounds = None
+    if 'bbox' in request.query:
+        try:
+            bounds = tuple(float(v) for v in request.query['bbox'].split(','))
+        except ValueError:
+            raise BadRequest("'bbox' must be four numbers")
+        if len(bounds) != 4:
+            raise BadRequest("'bbox' must be south,west,north,east")
+    tiles = await asyncio.to_thread(density_tiles.tiles_for, zoom, bounds)
+    return json_response(request, {
+        'zoom': zoom,
+        'tiles': json.loads(tiles.to_json(orient='records', force_ascii=False)),
+    })
+
+
+def _national_tables():
+    try:
+        return ranking.load_national_rankings()
+    except (OSError, ImportError, KeyError, ValueError):
+        raise web.HTTPServiceUnavailable(text=json.dumps({'error': 'national dataset unavailable'}),
+                                         content_type='application/json')
+
+
+async def national_attractions(request: web.Request) -> web.Response:
+
+    # Precomputed national Top-k; no upstream calls
+    region = request.query.get('region', '').strip()
+    if not region:
+        raise BadRequest("'region' is required")
+    k = _int_param(request, 'k', 5, minimum=1, maximum=ranking.TABLE_K)
+    tables = await asyncio.to_thread(_national_tables)
+    top = tables.top_attractions(region, k)
+    return json_response(request, {
+        'region': region,
+        'top': json.loads(top.to_json(orient='records', force_ascii=False)),
+    })
+
+
+async def national_restaurants(request: web.Request) -> web.Response:
+    region = request.query.get('region', '').strip()
+    attraction = request.query.get('attraction', '').strip()
+    if not region or not attraction:
+        raise BadRequest("'region' and 'attraction' are required")
+    k = _int_param(request, 'k', 5, minimum=1, maximum=ranking.TABLE_K)
+    tables = await asyncio.to_thread(_national_tables)
+    top = tables.top_restaurants(region, attraction, k)
+    return json_response(request, {
+        'region': region,
+        'attraction': attraction,
+        'top': json.loads(top.to_json(orient='records', force_ascii=False)),
+    })
+
+
+async def metrics(request: web.Request) -> web.Response:
+    return web.Response(text=usage.to_prometheus(), content_type='text/plain', charset='utf-8')
+
+
+async def healthz(request: web.Request) -> web.Response:
+    return web.json_response({'status': 'ok', 'google_key': bool(google_key)})
+
+
+async def _init_executor(app: web.Application):
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix='api-upstream')
+    )
+
+
+def create_app() -> web.Application:
+    app = web.Application(middlewares=[usage_scope])
+    app.on_startup.append(_init_executor)
+    app.router.add_get('/v1/attractions', attractions)
+    app.router.add_get('/v1/restaurants', restaurants)
+    app.router.add_get('/v1/recommendations', recommendations)
+    app.router.add_get('/v1/suggest', suggest)
+    app.router.add_get('/v1/density', density)
+    app.router.add_get('/v1/national/attractions', national_attractions)
+    app.router.add_get('/v1/national/restaurants', national_restaurants)
+    app.router.add_get('/metrics', metrics)
+    app.router.add_get('/healthz', healthz)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="관광지/맛집 추천 JSON API 서버")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import os
+import threading
+import contextvars
+from datetime import date
+from collections import defaultdict
+
+from config import env
+
+# -----------------------------------------------------------------------------
+# API 호출 집계 및 예산 설정
+# -----------------------------------------------------------------------------
+# Budgets are counted in upstream (billable) calls; cache hits are free.
+SESSION_BUDGET = int(env("API_SESSION_BUDGET", "150"))
+DAILY_BUDGET = int(env("API_DAILY_BUDGET", "5000"))
+# Fraction of a budget after which optional calls (reviews, photos) are skipped
+DEGRADE_RATIO = float(env("API_DEGRADE_RATIO", "0.8"))
+# Optional textfile for the Prometheus node_exporter textfile collector
+METRICS_FILE = env("API_METRICS_FILE")
+
+# Endpoints the page can render without, in the order they are dropped
+OPTIONAL_ENDPOINTS = ('details', 'photo')
+
+_current_session = contextvars.ContextVar('api_usage_session', default='default')
+
+
+def _new_counter() -> dict:
+    return {'calls': 0, 'bytes': 0, 'hits': 0, 'denied': 0}
+
+
+class ApiUsage:
+    """엔드포인트/세션/재실행 단위 API 호출 집계"""
+
+    def __init__(self, session_budget: int = SESSION_BUDGET, daily_budget: int = DAILY_BUDGET):
+        self.session_budget = session_budget
+        self.daily_budget = daily_budget
+        self._lock = threading.Lock()
+        self._totals = defaultdict(_new_counter)
+        self._sessions = defaultdict(lambda: defaultdict(_new_counter))
+        self._reruns = defaultdict(lambda: defaultdict(_new_counter))
+        self._rerun_ids = defaultdict(int)
+        self._day = date.today()
+        self._day_calls = 0
+
+    # -- scope ----------------------------------------------------------------
+    def begin_rerun(self, session_id: str) -> int:
+        _current_session.set(session_id)
+        with self._lock:
+            self._rerun_ids[session_id] += 1
+            self._reruns[session_id] = defaultdict(_new_counter)
+            return self._rerun_ids[session_id]
+
+    def end_rerun(self, session_id: str = None):
+        # Rerun counters are only read while the page renders
+        session_id = session_id or _current_session.get()
+        with self._lock:
+            self._reruns.pop(session_id, None)
+
+    def end_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._reruns.pop(session_id, None)
+            self._rerun_ids.pop(session_id, None)
+
+    # -- budget ---------------------------------------------------------------
+    def _roll_day(self):
+        today = date.today()
+        if today != self._day:
+            self._day = today
+            self._day_calls = 0
+
+    def _session_calls(self, session_id: str) -> int:
+        return sum(c['calls'] for c in self._sessions[session_id].values())
+
+    def allow(self, endpoint: str) -> bool:
+        session_id = _current_session.get()
+        with self._lock:
+            self._roll_day()
+            used = max(
+                self._session_calls(session_id) / self.session_budget if self.session_budget else 0,
+                self._day_calls / self.daily_budget if self.daily_budget else 0,
+            )
+            limit = DEGRADE_RATIO if endpoint in OPTIONAL_ENDPOINTS else 1.0
+            if used < limit:
+                return True
+            for scope in (self._totals, self._sessions[session_id], self._reruns[session_id]):
+                scope[endpoint]['denied'] += 1
+            return False
+
+    def degraded(self) -> bool:
+        session_id = _current_session.get()
+        with self._lock:
+            return any(c['denied'] for c in self._reruns[session_id].values())
+
+    # -- recording ------------------------------------------------------------
+    def record(self, endpoint: str, nbytes: int = 0, cache_hit: bool = False):
+        session_id = _current_session.get()
+        with self._lock:
+            self._roll_day()
+            for scope in (self._totals, self._sessions[session_id], self._reruns[session_id]):
+                counter = scope[endpoint]
+                if cache_hit:
+                    counter['hits'] += 1
+                else:
+                    counter['calls'] += 1
+                    counter['bytes'] += nbytes
+            if not cache_hit:
+                self._day_calls += 1
+
+    # -- reporting ------------------------------------------------------------
+    def snapshot(self, scope: str = 'session') -> dict:
+        session_id = _current_session.get()
+        with self._lock:
+            source = {
+                'process': self._totals,
+                'session': self._sessions[session_id],
+                'rerun': self._reruns[session_id],
+            }[scope]
+            return {endpoint: dict(counter) for endpoint, counter in source.items()}
+
+    def budget_status(self) -> dict:
+        session_id = _current_session.get()
+        with self._lock:
+            self._roll_day()
+            return {
+                'session_used': self._session_calls(session_id),
+                'session_budget': self.session_budget,
+                'day_used': self._day_calls,
+                'day_budget': self.daily_budget,
+            }
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            totals = {endpoint: dict(counter) for endpoint, counter in self._totals.items()}
+            sessions = len(self._sessions)
+            day_calls = self._day_calls
+        lines = []
+        metrics = [
+            ('upstream_api_calls_total', 'counter', 'Billable upstream API calls', 'calls'),
+            ('upstream_api_bytes_total', 'counter', 'Response bytes received from upstream APIs', 'bytes'),
+            ('upstream_api_cache_hits_total', 'counter', 'Upstream calls served from cache', 'hits'),
+            ('upstream_api_denied_total', 'counter', 'Upstream calls skipped by the budget', 'denied'),
+        ]
+        for name, kind, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for endpoint, counter in sorted(totals.items()):
+                lines.append(f'{name}{{endpoint="{endpoint}"}} {counter[field]}')
+        lines.append("# HELP upstream_api_daily_calls Billable upstream calls since midnight")
+        lines.append("# TYPE upstream_api_daily_calls gauge")
+        lines.append(f"upstream_api_daily_calls {day_calls}")
+        lines.append("# HELP upstream_api_daily_budget Configured daily call budget")
+        lines.append("# TYPE upstream_api_daily_budget gauge")
+        lines.append(f"upstream_api_daily_budget {self.daily_budget}")
+        lines.append("# HELP upstream_api_sessions Sessions with recorded usage")
+        lines.append("# TYPE upstream_api_sessions gauge")
+        lines.append(f"upstream_api_sessions {sessions}")
+        return "\n".join(lines) + "\n"
+
+    def write_metrics_file(self, path: str = METRICS_FILE):
+        if not path:
+            return
+        # Write atomically so the collector never reads a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def hit_ratio(counter: dict) -> float:
+    lookups = counter['calls'] + counter['hits']
+    return counter['hits'] / lookups if lookups else 0.0
+
+
+usage = ApiUsage()
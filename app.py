@@ -2,15 +2,13 @@ import streamlit as st
 import pandas as pd
 import requests
 import time
-import folium
-from streamlit_folium import st_folium
-from dotenv import load_dotenv
-import os
 import re
 
+from config import env
+import density_tiles
 
-load_dotenv()
-api_key = os.getenv("Google_key")
+
+api_key = env("Google_key")
 
 def preprocess_restaurant_data(df):
     # 이름 전처리
@@ -170,6 +168,9 @@ def main():
 
         # Show the attractions and restaurants on a map
         st.subheader("🗺 지도에서 보기")
+        # folium pulls in jinja2/branca; only pay for it once a map is drawn
+        import folium
+        from streamlit_folium import st_folium
         m = folium.Map(location=[lat, lng], zoom_start=13)
         folium.Marker([lat, lng], tooltip="관광지", icon=folium.Icon(color="blue")).add_to(m)
         for _, r in df.iterrows():
@@ -178,6 +179,9 @@ def main():
                 tooltip=f"{r['이름']} (⭐{r['평점']})",
                 icon=folium.Icon(color="green", icon="cutlery", prefix='fa')
             ).add_to(m)
+        # Pre-aggregated restaurant density around the attraction (density_tiles.py)
+        if density_tiles.add_heat_layer(m, 13, density_tiles.around(lat, lng, 10)):
+            folium.LayerControl().add_to(m)
         st_folium(m, width=700, height=500)
 
         # Provide CSV download of restaurant list
@@ -0,0 +1,213 @@
+import os
+import threading
+import unicodedata
+from bisect import bisect_left
+
+from national_data import NATIONAL_DATASET, REGIONS
+import ranking
+
+# -----------------------------------------------------------------------------
+# 지역/관광지 검색어 자동완성 (자모 단위 접두어/초성/오타 매칭)
+# -----------------------------------------------------------------------------
+# Short and administrative names people type for the 17 crawl regions
+REGION_ALIASES = {
+    '서울': ['서울시', '서울특별시'],
+    '부산': ['부산시', '부산광역시'],
+    '대구': ['대구시', '대구광역시'],
+    '인천': ['인천시', '인천광역시'],
+    # Not '광주시': that is a city in 경기도 (see address.py)
+    '광주': ['광주광역시'],
+    '대전': ['대전시', '대전광역시'],
+    '울산': ['울산시', '울산광역시'],
+    '세종': ['세종시', '세종특별자치시'],
+    '경기도': ['경기'],
+    '강원도': ['강원', '강원특별자치도'],
+    '충청북도': ['충북'],
+    '충청남도': ['충남'],
+    '전라북도': ['전북', '전북특별자치도'],
+    '전라남도': ['전남'],
+    '경상북도': ['경북'],
+    '경상남도': ['경남'],
+    '제주도': ['제주', '제주시', '제주특별자치도'],
+}
+DEFAULT_LIMIT = 8
+# Fuzzy matching only starts once a few jamo have been typed
+FUZZY_MIN_JAMO = 3
+
+_CHO = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_JUNG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+_JONG = ['', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+         'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+# Compound jamo are split so a half-typed syllable still prefixes the full one
+_SPLIT = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+
+
+def normalize(text: str) -> str:
+    # Case, spacing and punctuation never distinguish two places
+    text = unicodedata.normalize('NFC', text or '').lower()
+    return ''.join(ch for ch in text if ch.isalnum())
+
+
+def decompose(text: str) -> str:
+
+    # "제주" -> "ㅈㅔㅈㅜ"; the IME's intermediate "젲" -> "ㅈㅔㅈ" is then a prefix
+    out = []
+    for ch in normalize(text):
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+            out.append(_SPLIT.get(_JUNG[code % 588 // 28], _JUNG[code % 588 // 28]))
+            jong = _JONG[code % 28]
+            out.append(_SPLIT.get(jong, jong))
+        else:
+            out.append(_SPLIT.get(ch, ch))
+    return ''.join(out)
+
+
+def initials(text: str) -> str:
+    # "해운대" -> "ㅎㅇㄷ", for queries typed as consonants only
+    return ''.join(_CHO[(ord(ch) - 0xAC00) // 588] if 0 <= ord(ch) - 0xAC00 < 11172 else ch
+                   for ch in normalize(text))
+
+
+def _is_initials(text: str) -> bool:
+    return bool(text) and all(ch in _CHO for ch in text)
+
+
+def prefix_distance(query: str, key: str, limit: int) -> int:
+
+    # Edit distance from query to the closest prefix of key; gives up past limit
+    prev = list(range(len(key) + 1))
+    for i, qc in enumerate(query, 1):
+        row = [i]
+        for j, kc in enumerate(key, 1):
+            row.append(min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + (qc != kc)))
+        if min(row) > limit:
+            return limit + 1
+        prev = row
+    return min(prev)
+
+
+class Entry:
+    """자동완성 후보 한 건 (지역 또는 관광지)"""
+
+    __slots__ = ('label', 'kind', 'region')
+
+    def __init__(self, label: str, kind: str, region: str):
+        self.label = label
+        self.kind = kind
+        self.region = region
+
+    def as_dict(self) -> dict:
+        return {'label': self.label, 'kind': self.kind, 'region': self.region}
+
+
+class SuggestIndex:
+    """지역/관광지 이름의 자모 정렬 목록 (접두어는 이분 탐색, 오타는 편집 거리)"""
+
+    def __init__(self, attractions: list = ()):
+        # attractions: (region, name) pairs
+        self.entries = [Entry(region, '지역', region) for region in REGIONS]
+        seen = set()
+        for region, name in attractions:
+            if name and (region, name) not in seen:
+                seen.add((region, name))
+                self.entries.append(Entry(str(name), '관광지', str(region)))
+        self._exact = {}
+        keys = []
+        for i, entry in enumerate(self.entries):
+            names = [entry.label] + (REGION_ALIASES.get(entry.label, []) if entry.kind == '지역' else [])
+            for name in names:
+                # Regions win an exact tie with an attraction of the same name
+                self._exact.setdefault(normalize(name), i)
+                keys.append((decompose(name), i))
+                # Later words too: "해수" finds "해운대 해수욕장"
+                keys.extend((decompose(word), i) for word in name.split()[1:])
+        keys.sort()
+        self._keys = [k for k, _ in keys]
+        self._ids = [i for _, i in keys]
+        self._initials = [(initials(e.label), i) for i, e in enumerate(self.entries)]
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def has_attractions(self) -> bool:
+        return len(self.entries) > len(REGIONS)
+
+    def resolve(self, text: str):
+        i = self._exact.get(normalize(text))
+        return None if i is None else self.entries[i]
+
+    def suggest(self, text: str, limit: int = DEFAULT_LIMIT) -> list:
+
+        # Exact, then jamo prefix, then initials, then near-misses; regions first
+        query = decompose(text)
+        if not query:
+            return []
+        scored = {}
+
+        def offer(i: int, rank: int):
+            if rank < scored.get(i, (99,))[0]:
+                scored[i] = (rank, self.entries[i].kind != '지역', len(self.entries[i].label), self.entries[i].label)
+
+        exact = self._exact.get(normalize(text))
+        if exact is not None:
+            offer(exact, 0)
+        start = bisect_left(self._keys, query)
+        for pos in range(start, len(self._keys)):
+            if not self._keys[pos].startswith(query):
+                break
+            offer(self._ids[pos], 1)
+        typed = normalize(text)
+        if _is_initials(typed):
+            for key, i in self._initials:
+                if key.startswith(typed):
+                    offer(i, 2)
+        elif len(scored) < limit and len(query) >= FUZZY_MIN_JAMO:
+            budget = 1 if len(query) < 8 else 2
+            for key, i in zip(self._keys, self._ids):
+                if i not in scored and len(key) >= len(query) - budget:
+                    # No prefix longer than this can be within budget
+                    distance = prefix_distance(query, key[:len(query) + budget], budget)
+                    if distance <= budget:
+                        offer(i, 2 + distance)
+        ranked = sorted(scored, key=scored.get)
+        return [self.entries[i] for i in ranked[:limit]]
+
+
+# -----------------------------------------------------------------------------
+# 색인 적재 (지역은 바로, 관광지는 전국 시트를 읽은 뒤)
+# -----------------------------------------------------------------------------
+_region_index = SuggestIndex()
+_indexes = {}
+_building = set()
+_lock = threading.Lock()
+
+
+def _build(path: str):
+    try:
+        attractions = ranking.load_national_rankings(path).attractions
+        pairs = zip(attractions['지역'].astype(str), attractions['관광지명'].astype(str))
+        index = SuggestIndex(list(pairs))
+    except (OSError, ImportError, KeyError, ValueError):
+        # Unreadable sheet: regions still autocomplete
+        index = _region_index
+    with _lock:
+        _indexes[path] = index
+
+
+def current_index(path: str = NATIONAL_DATASET) -> SuggestIndex:
+
+    # Reading the sheet takes a while, so it happens off the calling thread;
+    # until then only the regions are indexed
+    with _lock:
+        index = _indexes.get(path)
+        if index is None and path not in _building and os.path.exists(path):
+            _building.add(path)
+            threading.Thread(target=_build, args=(path,), daemon=True).start()
+    return index or _region_index
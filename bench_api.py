@@ -0,0 +1,91 @@
+import time
+import asyncio
+import argparse
+import statistics
+
+import aiohttp
+
+# -----------------------------------------------------------------------------
+# JSON API 처리량 측정 (python bench_api.py --concurrency 1 8 32)
+# -----------------------------------------------------------------------------
+DEFAULT_PATHS = [
+    "/v1/attractions?query=제주",
+    "/v1/attractions?query=부산&page=2&page_size=10",
+    "/v1/recommendations?query=제주",
+]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+async def _worker(session, base_url: str, paths: list, deadline: float, latencies: list, errors: list,
+                  use_etag: bool):
+    etags = {}
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        headers = {'If-None-Match': etags[path]} if use_etag and path in etags else {}
+        start = time.perf_counter()
+        try:
+            async with session.get(base_url + path, headers=headers) as res:
+                await res.read()
+                if res.status >= 400:
+                    errors.append(res.status)
+                elif 'ETag' in res.headers:
+                    etags[path] = res.headers['ETag']
+        except aiohttp.ClientError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(base_url: str, concurrency: int, duration: float, paths: list, use_etag: bool) -> dict:
+    latencies, errors = [], []
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # One warm-up pass so the first upstream fetches don't skew the numbers
+        for path in paths:
+            async with session.get(base_url + path) as res:
+                await res.read()
+        deadline = time.perf_counter() + duration
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _worker(session, base_url, paths, deadline, latencies, errors, use_etag)
+            for _ in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'mean_ms': statistics.fmean(latencies) if latencies else 0.0,
+        'errors': len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="api_server.py 처리량/지연 측정")
+    parser.add_argument('--url', default="http://localhost:8080")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32, 128])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--path', action='append', help="요청 경로 (여러 번 지정 가능)")
+    parser.add_argument('--etag', action='store_true', help="If-None-Match 재검증 요청 사용")
+    args = parser.parse_args()
+    paths = args.path or DEFAULT_PATHS
+    print(f"{'conc':>5} {'req':>7} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for concurrency in args.concurrency:
+        r = asyncio.run(run(args.url, concurrency, args.duration, paths, args.etag))
+        print(f"{r['concurrency']:>5} {r['requests']:>7} {r['rps']:>9.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# -----------------------------------------------------------------------------
+# 앱 기동 시간 측정 (python bench_startup.py streamlit_MATtour_top5tour.py top5.py)
+# -----------------------------------------------------------------------------
+APP_SCRIPT = "streamlit_MATtour_top5tour.py"
+# A new worker should have the script imported and the first page out within these
+IMPORT_BUDGET_MS = 2000.0
+FIRST_RENDER_BUDGET_MS = 4000.0
+DEFAULT_REPEAT = 3
+TOP_IMPORTS = 10
+
+# Loads the script as a module: imports and definitions only, main() is not called
+_IMPORT_SNIPPET = "import runpy, sys; runpy.run_path(sys.argv[1], run_name='__bench__')"
+# A fresh interpreter per run, so every render pays the cold import cost
+_RENDER_SNIPPET = """
+import sys, time, json
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=float(sys.argv[2])).run()
+print(json.dumps({
+    'first_render_ms': (time.perf_counter() - start) * 1000,
+    'exceptions': [e.message for e in at.exception],
+}))
+"""
+
+
+def _bench_env() -> dict:
+
+    # Dummy keys keep the apps from stopping at their key check; nothing here
+    # may reach the real APIs
+    env = dict(os.environ)
+    env.setdefault('Google_key', 'bench')
+    env.setdefault('KAKAO_KEY', 'bench')
+    env.setdefault('TRACE_ENABLED', '0')
+    return env
+
+
+def parse_importtime(stderr: str) -> list:
+
+    # "import time: self [us] | cumulative | imported package", nested imports
+    # indented under the one that triggered them
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append({
+            'name': name.strip(),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+    return rows
+
+
+def measure_imports(script: str) -> dict:
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', _IMPORT_SNIPPET, script],
+                          capture_output=True, text=True, env=_bench_env())
+    rows = parse_importtime(proc.stderr)
+    # Everything before runpy is interpreter startup (site, encodings), not the app
+    names = [r['name'] for r in rows]
+    rows = rows[names.index('runpy') + 1:] if 'runpy' in names else rows
+    top = [r for r in rows if r['depth'] == 0]
+    return {
+        'import_ms': sum(r['cumulative_ms'] for r in top),
+        'modules': len(rows),
+        'top': sorted(top, key=lambda r: r['cumulative_ms'], reverse=True),
+        'error': proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+    }
+
+
+def measure_first_render(script: str, timeout: float = 60.0) -> dict:
+    proc = subprocess.run([sys.executable, '-c', _RENDER_SNIPPET, script, str(timeout)],
+                          capture_output=True, text=True, env=_bench_env())
+    if proc.returncode:
+        return {'first_render_ms': None, 'exceptions': [proc.stderr.strip().splitlines()[-1]]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def bench(script: str, repeat: int = DEFAULT_REPEAT, render: bool = True) -> dict:
+
+    # The first run also warms the OS file cache, so the median is reported
+    imports = [measure_imports(script) for _ in range(repeat)]
+    result = {
+        'script': script,
+        'import_ms': statistics.median(r['import_ms'] for r in imports),
+        'modules': imports[-1]['modules'],
+        'top_imports': [(r['name'], r['cumulative_ms']) for r in imports[-1]['top'][:TOP_IMPORTS]],
+        'errors': [r['error'] for r in imports if r['error']],
+        'first_render_ms': None,
+    }
+    if render:
+        renders = [measure_first_render(script) for _ in range(repeat)]
+        times = [r['first_render_ms'] for r in renders if r['first_render_ms'] is not None]
+        result['first_render_ms'] = statistics.median(times) if times else None
+        result['errors'] += [e for r in renders for e in r['exceptions']]
+    return result
+
+
+def over_budget(result: dict, import_budget: float, render_budget: float) -> list:
+    failures = []
+    if result['errors'] and result['first_render_ms'] is None:
+        failures.append(f"did not start: {result['errors'][0]}")
+    if result['import_ms'] > import_budget:
+        failures.append(f"import {result['import_ms']:.0f} ms > {import_budget:.0f} ms")
+    if result['first_render_ms'] is not None and result['first_render_ms'] > render_budget:
+        failures.append(f"first render {result['first_render_ms']:.0f} ms > {render_budget:.0f} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 스크립트의 import 시간과 첫 화면 렌더링 시간을 예산과 비교합니다")
+    parser.add_argument('scripts', nargs='*', default=[APP_SCRIPT])
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--import-budget-ms', type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument('--render-budget-ms', type=float, default=FIRST_RENDER_BUDGET_MS)
+    parser.add_argument('--no-render', action='store_true', help="import 시간만 측정 (streamlit AppTest 생략)")
+    parser.add_argument('--json', help="결과를 JSON 파일로 저장 (실행 간 비교용)")
+    args = parser.parse_args()
+
+    results, failed = [], False
+    for script in args.scripts:
+        r = bench(script, args.repeat, not args.no_render)
+        r['over_budget'] = over_budget(r, args.import_budget_ms, args.render_budget_ms)
+        results.append(r)
+        render = '-' if r['first_render_ms'] is None else f"{r['first_render_ms']:.0f} ms"
+        print(f"{script}: import {r['import_ms']:.0f} ms ({r['modules']} modules), first render {render}")
+        for name, ms in r['top_imports']:
+            print(f"    {ms:>8.1f} ms  {name}")
+        for error in r['errors'][:3]:
+            print(f"    ! {error}")
+        for failure in r['over_budget']:
+            print(f"    ✗ 예산 초과: {failure}")
+        failed = failed or bool(r['over_budget'])
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.time(), 'args': vars(args), 'results': results}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"저장 완료: {args.json}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import io
+import sys
+import json
+import time
+import zlib
+import pickle
+import sqlite3
+import hashlib
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+
+from config import env
+
+# -----------------------------------------------------------------------------
+# 캐시 백엔드 설정
+# -----------------------------------------------------------------------------
+# memory: private to the process (default)
+# sqlite: one WAL-mode file shared by every worker process on the host
+# redis:  any Redis-compatible server (redis, valkey, dragonfly, ...)
+CACHE_BACKEND = env("CACHE_BACKEND", "memory")
+CACHE_PATH = env("CACHE_PATH", "cache.sqlite")
+CACHE_REDIS_URL = env("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# Payloads smaller than this are stored uncompressed
+COMPRESS_MIN_BYTES = 512
+# Memory backend bounds; least recently used entries go first
+CACHE_MEMORY_MAX_ENTRIES = int(env("CACHE_MEMORY_MAX_ENTRIES", "4096"))
+CACHE_MEMORY_MAX_BYTES = int(env("CACHE_MEMORY_MAX_BYTES", str(256 * 1024 * 1024)))
+# Expired entries are swept every this many writes
+SWEEP_EVERY = 200
+
+try:
+    import msgpack
+except ImportError:  # JSON is the fallback wire format
+    msgpack = None
+
+
+@lru_cache(maxsize=1)
+def _arrow():
+    # Loaded with the first DataFrame rather than at import time
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:  # DataFrames fall back to pickle
+        return None
+    return pa
+
+
+# -----------------------------------------------------------------------------
+# 값 직렬화 (타입 태그 1바이트 + 압축 플래그 1바이트 + 본문)
+# -----------------------------------------------------------------------------
+def encode(value) -> bytes:
+
+    import pandas as pd
+    if isinstance(value, (bytes, bytearray)):
+        # Photos are already JPEG-compressed; don't spend CPU recompressing them
+        return b'B0' + bytes(value)
+    if isinstance(value, pd.DataFrame):
+        pa = _arrow()
+        if pa is not None:
+            try:
+                table = pa.Table.from_pandas(value, preserve_index=False)
+                sink = io.BytesIO()
+                options = pa.ipc.IpcWriteOptions(compression='zstd')
+                with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+                    writer.write_table(table)
+                return b'A0' + sink.getvalue()
+            except (pa.ArrowException, TypeError, ValueError):
+                pass
+        tag, body = b'P', pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    elif msgpack is not None:
+        tag, body = b'M', msgpack.packb(value, use_bin_type=True)
+    else:
+        tag, body = b'J', json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if len(body) >= COMPRESS_MIN_BYTES:
+        return tag + b'z' + zlib.compress(body, 6)
+    return tag + b'0' + body
+
+
+def decode(blob: bytes):
+
+    tag, flag, body = blob[:1], blob[1:2], blob[2:]
+    if flag == b'z':
+        body = zlib.decompress(body)
+    if tag == b'B':
+        return body
+    if tag == b'A':
+        with _arrow().ipc.open_stream(body) as reader:
+            return reader.read_all().to_pandas()
+    if tag == b'P':
+        return pickle.loads(body)
+    if tag == b'M':
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+def make_key(namespace: str, *parts) -> str:
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+# -----------------------------------------------------------------------------
+# 백엔드 구현
+# -----------------------------------------------------------------------------
+def _approx_size(value) -> int:
+    # Images, exports and DataFrames dominate; everything else is counted shallowly
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    memory_usage = getattr(value, 'memory_usage', None)
+    if callable(memory_usage):
+        try:
+            return int(memory_usage(deep=True).sum())
+        except (TypeError, ValueError):
+            pass
+    return sys.getsizeof(value)
+
+
+class MemoryBackend:
+    """프로세스 내부 LRU 캐시 (항목 수/바이트 상한)"""
+
+    def __init__(self, max_entries: int = CACHE_MEMORY_MAX_ENTRIES, max_bytes: int = CACHE_MEMORY_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (expires, size, value), oldest use first
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._writes = 0
+
+    def _pop(self, key: str):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, _, value = item
+            if expires and expires < time.time():
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: int = None):
+        expires = time.time() + ttl if ttl else 0
+        size = _approx_size(value)
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (expires, size, value)
+            self._bytes += size
+            self._writes += 1
+            # Sweep expired entries now and then instead of on every write
+            if self._writes % SWEEP_EVERY == 0:
+                now = time.time()
+                for k in [k for k, (e, _, _) in self._data.items() if e and e < now]:
+                    self._pop(k)
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                self._pop(next(iter(self._data)))
+
+    def delete(self, key: str):
+        with self._lock:
+            self._pop(key)
+
+
+class SqliteBackend:
+    """WAL 모드 SQLite 파일을 여러 프로세스가 공유하는 캐시"""
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_expires ON cache(expires)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        row = self._conn().execute(
+            "SELECT value, expires FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        blob, expires = row
+        if expires and expires < time.time():
+            return None
+        return decode(blob)
+
+    def set(self, key: str, value, ttl: int = None):
+        expires = time.time() + ttl if ttl else 0
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, encode(value), expires),
+            )
+            with self._lock:
+                self._writes += 1
+                sweep = self._writes % SWEEP_EVERY == 0
+            # Sweep expired rows now and then instead of on every write
+            if sweep:
+                conn.execute("DELETE FROM cache WHERE expires > 0 AND expires < ?", (time.time(),))
+
+    def delete(self, key: str):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+class RedisBackend:
+    """Redis 호환 서버를 공유 캐시로 사용"""
+
+    def __init__(self, url: str = CACHE_REDIS_URL):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str):
+        blob = self._client.get(key)
+        return decode(blob) if blob is not None else None
+
+    def set(self, key: str, value, ttl: int = None):
+        self._client.set(key, encode(value), ex=ttl or None)
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+
+_BACKENDS = {
+    'memory': MemoryBackend,
+    'sqlite': SqliteBackend,
+    'redis': RedisBackend,
+}
+
+
+def create_backend(name: str = CACHE_BACKEND):
+    try:
+        return _BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown CACHE_BACKEND '{name}' (expected one of {sorted(_BACKENDS)})")
+
+
+cache = create_backend()
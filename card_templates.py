@@ -0,0 +1,102 @@
+from html import escape
+from string import Template
+
+# -----------------------------------------------------------------------------
+# 추천 카드 HTML 템플릿
+# -----------------------------------------------------------------------------
+# Marks an asset that is still being fetched; rendered as a skeleton block
+PENDING = object()
+
+# Shared styles go out once per row instead of being repeated on every element
+ROW_CSS = """
+<style>
+.mt-row { display:grid; gap:1rem; }
+.mt-card { background-color:#F7F7F7; border-radius:15px; padding:16px; margin-top:10px;
+  display:flex; flex-direction:column; justify-content:flex-start; box-shadow:0 4px 8px rgba(0,0,0,0.1); }
+.mt-title { display:flex; align-items:center; justify-content:space-between; }
+.mt-title-attraction { min-height:36px; }
+.mt-title-restaurant { height:48px; overflow:hidden; margin-bottom:5px; }
+.mt-name { font-weight:bold; font-size:18px; color:#000000; flex-grow:1; text-align:center; }
+.mt-link { font-size:14px; color:#999999; text-decoration:none; margin-left:4px; }
+.mt-link:hover { color:#005FCC; }
+.mt-img { width:100%; height:150px; object-fit:cover; border-radius:8px; margin-top:5px;
+  background-size:cover; transition:transform 0.3s ease; }
+.mt-img:hover { transform:scale(1.05); }
+.mt-rating { margin-top:8px; min-height:28px; font-size:14px; color:#F39C12; text-align:center; }
+.mt-address { margin-top:8px; min-height:44px; font-size:12px; line-height:1.4; color:#666666; text-align:center; }
+.mt-review { margin-top:8px; font-size:12px; line-height:1.4; color:#444444; text-align:center; }
+.mt-author { font-size:11px; color:#888888; }
+.mt-skeleton { background-color:#E4E4E4; border-radius:5px; }
+</style>
+"""
+
+ROW_TEMPLATE = Template(
+    "$css<div class='mt-row' style='grid-template-columns:repeat($columns, minmax(0, 1fr));'>$cards</div>"
+)
+CARD_TEMPLATE = Template(
+    "<div class='mt-card' style='height:${height}px;'>"
+    "<div class='mt-title mt-title-$variant'>"
+    "<span class='mt-name'>$name</span>"
+    "<a class='mt-link' href='$link' target='_blank'>🔗</a>"
+    "</div>"
+    "$image"
+    "<div class='mt-rating'>⭐ $rating</div>"
+    "<div class='mt-address'>$line1<br>$line2</div>"
+    "$review"
+    "</div>"
+)
+IMAGE_TEMPLATE = Template(
+    "<img class='mt-img' src='$src' loading='lazy' decoding='async' style='$background'/>"
+)
+REVIEW_TEMPLATE = Template(
+    "<div class='mt-review'>“$text”<br><span class='mt-author'>- $author</span></div>"
+)
+SKELETON_IMAGE = "<div class='mt-skeleton' style='width:100%; height:150px; margin-top:5px; border-radius:8px;'></div>"
+SKELETON_REVIEW = (
+    "<div style='margin-top:8px;'>"
+    "<div class='mt-skeleton' style='height:10px; margin:6px 10%;'></div>"
+    "<div class='mt-skeleton' style='height:10px; margin:6px 25%;'></div>"
+    "</div>"
+)
+CARD_HEIGHTS = {'attraction': 400, 'restaurant': 410}
+
+
+def image_html(image) -> str:
+    if image is PENDING:
+        return SKELETON_IMAGE
+    if not image:
+        return ''
+    background = f"background-image:url({image['placeholder']});" if image.get('placeholder') else ''
+    return IMAGE_TEMPLATE.substitute(src=escape(image['src']), background=background)
+
+
+def review_html(review) -> str:
+    if review is PENDING:
+        return SKELETON_REVIEW
+    if not review:
+        return ''
+    return REVIEW_TEMPLATE.substitute(text=escape(review['text']), author=escape(review['author']))
+
+
+def card_html(card: dict, variant: str) -> str:
+    return CARD_TEMPLATE.substitute(
+        height=CARD_HEIGHTS[variant],
+        variant=variant,
+        name=escape(str(card['name'])),
+        link=escape(card['link']),
+        image=image_html(card['image']),
+        rating=escape(str(card['rating'])),
+        line1=escape(card['line1']),
+        line2=escape(card['line2']),
+        review=review_html(card['review']),
+    )
+
+
+def render_row(cards: list, variant: str) -> str:
+
+    # The whole Top-5 row as one HTML string, i.e. one Streamlit delta
+    return ROW_TEMPLATE.substitute(
+        css=ROW_CSS,
+        columns=len(cards),
+        cards="".join(card_html(card, variant) for card in cards),
+    )
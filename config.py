@@ -0,0 +1,21 @@
+import os
+from functools import lru_cache
+
+# -----------------------------------------------------------------------------
+# 환경 설정 (.env 는 프로세스당 한 번만 읽는다)
+# -----------------------------------------------------------------------------
+# Streamlit re-executes app scripts on every rerun, so a load_dotenv() at the
+# top of a script re-reads the file each time; modules are imported once.
+
+
+@lru_cache(maxsize=1)
+def _load_dotenv():
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def env(name: str, default: str = None) -> str:
+    # Settings modules read theirs at import time, so .env has to be loaded by then
+    _load_dotenv()
+    return os.getenv(name, default)
+
@@ -0,0 +1,178 @@
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from config import env
+
+# -----------------------------------------------------------------------------
+# 렌더링 마감 시각 / 지연 추적 / 헤지 요청
+# -----------------------------------------------------------------------------
+# Whole rerun, and the share of it the Top-5 card photos/reviews may use
+RENDER_BUDGET = float(env("RENDER_BUDGET", "10"))
+CARD_ASSET_BUDGET = float(env("CARD_ASSET_BUDGET", "1.5"))
+# Reviews are the first thing given up: they only get this part of the card budget
+REVIEW_SHARE = 0.6
+# Upper bound for any single upstream request, deadline or not
+UPSTREAM_TIMEOUT = float(env("UPSTREAM_TIMEOUT", "10"))
+MIN_TIMEOUT = 0.05
+# A second request goes out once the first has taken longer than the endpoint's p95
+HEDGE_ENABLED = env("HEDGE_ENABLED", "1") == "1"
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+# Second requests in flight at once; beyond this a slow call simply isn't hedged
+HEDGE_MAX_IN_FLIGHT = int(env("HEDGE_MAX_IN_FLIGHT", "8"))
+# First requests that can race a hedge at once; beyond this they run on the caller's thread, unhedged
+RACE_MAX_IN_FLIGHT = int(env("HEDGE_RACE_MAX_IN_FLIGHT", "64"))
+
+_deadline = contextvars.ContextVar('deadline', default=None)
+# A free slot is taken before every submit, so neither pool ever queues work
+_race_pool = ThreadPoolExecutor(max_workers=RACE_MAX_IN_FLIGHT, thread_name_prefix='upstream')
+_race_slots = threading.BoundedSemaphore(RACE_MAX_IN_FLIGHT)
+_hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_MAX_IN_FLIGHT, thread_name_prefix='hedge')
+_hedge_slots = threading.BoundedSemaphore(HEDGE_MAX_IN_FLIGHT)
+
+
+@contextmanager
+def scope(seconds: float):
+
+    # Nested scopes can only tighten the deadline, never extend it
+    at = time.monotonic() + seconds
+    parent = _deadline.get()
+    if parent is not None:
+        at = min(at, parent)
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+def clear():
+    # For background work that outlives the rerun that started it
+    _deadline.set(None)
+
+
+def remaining():
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def timeout(default: float = UPSTREAM_TIMEOUT) -> float:
+    left = remaining()
+    return default if left is None else max(MIN_TIMEOUT, min(default, left))
+
+
+class LatencyTracker:
+    """엔드포인트별 최근 응답 시간 (헤지 기준)"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, endpoint: str, seconds: float):
+        with self._lock:
+            self._samples[endpoint].append(seconds)
+
+    def quantile(self, endpoint: str, q: float):
+        with self._lock:
+            samples = sorted(self._samples[endpoint])
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+latency = LatencyTracker()
+
+
+class Scheduler:
+    """지정한 시각에 함수를 실행하는 스레드 하나짜리 타이머"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._thread = None
+
+    def call_at(self, at: float, fn):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='hedge-timer', daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (at, next(self._seq), fn))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                at, _, fn = self._heap[0]
+                wait_for = at - time.monotonic()
+                if wait_for > 0:
+                    self._cond.wait(wait_for)
+                    continue
+                heapq.heappop(self._heap)
+            # Callbacks only look at their call's state and submit; they never block
+            fn()
+
+
+_timer = Scheduler()
+
+
+def hedged(endpoint: str, call, allow_second=lambda: True):
+
+    # call() goes out at once; if it is still going after the endpoint's p95,
+    # an identical second call races it and the first success wins. Without a
+    # free slot the call just runs on the caller's thread, unhedged.
+    delay = latency.quantile(endpoint, HEDGE_QUANTILE) if HEDGE_ENABLED else None
+    if delay is None or not _race_slots.acquire(blocking=False):
+        return call()
+    cond = threading.Condition()
+    state = {'running': 1, 'done': False, 'won': False, 'value': None, 'error': None}
+
+    def run():
+        try:
+            value, error = call(), None
+        except Exception as e:
+            value, error = None, e
+        with cond:
+            state['running'] -= 1
+            if state['done']:
+                return
+            if error is None:
+                state['value'] = value
+                state['won'] = state['done'] = True
+            else:
+                state['error'] = error
+                # A failure only ends the race once nothing else is running
+                state['done'] = state['running'] == 0
+            cond.notify_all()
+
+    def launch():
+        with cond:
+            if state['done'] or expired() or not allow_second():
+                return
+            if not _hedge_slots.acquire(blocking=False):
+                return
+            state['running'] += 1
+        _hedge_pool.submit(contextvars.copy_context().run, run).add_done_callback(lambda _: _hedge_slots.release())
+
+    _race_pool.submit(contextvars.copy_context().run, run).add_done_callback(lambda _: _race_slots.release())
+    _timer.call_at(time.monotonic() + delay, lambda ctx=contextvars.copy_context(): ctx.run(launch))
+    with cond:
+        while not state['done']:
+            cond.wait()
+        if not state['won']:
+            raise state['error']
+        return state['value']
@@ -0,0 +1,219 @@
+import os
+import json
+import gzip
+import argparse
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import ranking
+from national_data import NATIONAL_DATASET, load_national
+
+# -----------------------------------------------------------------------------
+# 전국 맛집 밀도 타일 (python density_tiles.py -> restaurant_tiles.json.gz)
+# -----------------------------------------------------------------------------
+TILES_FILE = "restaurant_tiles.json.gz"
+# Geohash lengths kept: 3 ~ 156 km, 4 ~ 39 km, 5 ~ 4.9 km, 6 ~ 1.2 km, 7 ~ 153 m cells
+PRECISIONS = (3, 4, 5, 6, 7)
+TOP_K = 3
+COLUMNS = ['geohash', 'lat', 'lng', 'count', 'mean_rating', 'top']
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def geohash_cells(lat, lng, precision: int) -> np.ndarray:
+
+    # Geohash as an integer: 5 bits per character, longitude and latitude
+    # bits interleaved from the most significant end (longitude first)
+    bits = 5 * precision
+    lng_bits, lat_bits = (bits + 1) // 2, bits // 2
+    lat = np.asarray(lat, dtype=float)
+    lng = np.asarray(lng, dtype=float)
+    lat_i = np.clip(((lat + 90) / 180 * 2 ** lat_bits).astype(np.int64), 0, 2 ** lat_bits - 1).astype(np.uint64)
+    lng_i = np.clip(((lng + 180) / 360 * 2 ** lng_bits).astype(np.int64), 0, 2 ** lng_bits - 1).astype(np.uint64)
+    cells = np.zeros(len(lat), dtype=np.uint64)
+    one = np.uint64(1)
+    for i in range(bits):
+        source, width = (lng_i, lng_bits) if i % 2 == 0 else (lat_i, lat_bits)
+        bit = (source >> np.uint64(width - 1 - i // 2)) & one
+        cells = (cells << one) | bit
+    return cells
+
+
+def geohash_strings(cells: np.ndarray, precision: int) -> np.ndarray:
+    alphabet = np.array(list(_BASE32))
+    chars = [alphabet[((cells >> np.uint64(5 * (precision - 1 - j))) & np.uint64(31)).astype(np.int64)]
+             for j in range(precision)]
+    out = chars[0].astype(object)
+    for column in chars[1:]:
+        out = out + column
+    return out
+
+
+def precision_for_zoom(zoom: float) -> int:
+    # Leaflet zoom levels; roughly a few cells per heat blob at each level
+    if zoom <= 6:
+        return 3
+    if zoom <= 8:
+        return 4
+    if zoom <= 10:
+        return 5
+    if zoom <= 12:
+        return 6
+    return 7
+
+
+# -----------------------------------------------------------------------------
+# 타일 집계
+# -----------------------------------------------------------------------------
+def restaurant_points(df: pd.DataFrame) -> pd.DataFrame:
+
+    # A restaurant near two attractions appears twice in the sheet; coordinates
+    # come from geocode_batch.py (맛집위도/맛집경도)
+    if '맛집위도' not in df.columns or '맛집경도' not in df.columns:
+        raise ValueError("맛집위도/맛집경도 열이 없습니다. 먼저 geocode_batch.py 로 맛집주소를 변환하세요.")
+    points = df.dropna(subset=['맛집명', '맛집위도', '맛집경도']).drop_duplicates(subset=['맛집명', '맛집주소'])
+    ratings = (pd.to_numeric(points['맛집평점'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+               if '맛집평점' in points.columns else np.full(len(points), np.nan))
+    counts = (pd.to_numeric(points['맛집리뷰수'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+              if '맛집리뷰수' in points.columns else np.full(len(points), np.nan))
+    return pd.DataFrame({
+        'name': points['맛집명'].astype(str).to_numpy(),
+        'lat': points['맛집위도'].to_numpy(dtype=float, na_value=np.nan),
+        'lng': points['맛집경도'].to_numpy(dtype=float, na_value=np.nan),
+        'rating': ratings,
+        # Without ratings (Kakao rows) every restaurant scores the same and
+        # the tile's top-k falls back to sheet order
+        'score': np.nan_to_num(ranking.weighted_score(ratings, counts), nan=0.0),
+    })
+
+
+def aggregate(points: pd.DataFrame, precision: int, k: int = TOP_K) -> pd.DataFrame:
+    cells = geohash_cells(points['lat'], points['lng'], precision)
+    frame = points.assign(cell=cells)
+    grouped = frame.groupby('cell', sort=True)
+    tiles = grouped.agg(lat=('lat', 'mean'), lng=('lng', 'mean'), count=('name', 'size'),
+                        mean_rating=('rating', 'mean'))
+    top = (frame.sort_values(['cell', 'score'], ascending=[True, False], kind='stable')
+           .groupby('cell', sort=True).head(k)
+           .groupby('cell', sort=True)['name'].agg(list))
+    tiles['top'] = top
+    tiles['geohash'] = geohash_strings(tiles.index.to_numpy(dtype=np.uint64), precision)
+    return tiles.reset_index(drop=True)[COLUMNS]
+
+
+def build_tiles(df: pd.DataFrame, precisions=PRECISIONS, k: int = TOP_K) -> dict:
+    points = restaurant_points(df)
+    levels = {}
+    for precision in precisions:
+        tiles = aggregate(points, precision, k)
+        # Column arrays: one key per field instead of per tile, and the
+        # reader builds its DataFrame without touching every row
+        levels[str(precision)] = {
+            'geohash': tiles['geohash'].tolist(),
+            'lat': tiles['lat'].round(5).tolist(),
+            'lng': tiles['lng'].round(5).tolist(),
+            'count': tiles['count'].astype(int).tolist(),
+            'mean_rating': [None if pd.isna(v) else v for v in tiles['mean_rating'].round(2).tolist()],
+            'top': tiles['top'].tolist(),
+        }
+    return {
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'restaurants': len(points),
+        'top_k': k,
+        'levels': levels,
+    }
+
+
+def save_tiles(tiles: dict, path: str = TILES_FILE):
+    tmp = path + '.tmp'
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        json.dump(tiles, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+# -----------------------------------------------------------------------------
+# 지도 레이어용 조회
+# -----------------------------------------------------------------------------
+@lru_cache(maxsize=2)
+def _load(path: str, mtime: float) -> dict:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        tiles = json.load(f)
+    return {int(p): pd.DataFrame(columns, columns=COLUMNS) for p, columns in tiles['levels'].items()}
+
+
+def load_tiles(path: str = TILES_FILE) -> dict:
+    # precision -> DataFrame; reloaded only when the job rewrites the file
+    if not os.path.exists(path):
+        return {}
+    return _load(path, os.path.getmtime(path))
+
+
+def tiles_for(zoom: float, bounds: tuple = None, path: str = TILES_FILE) -> pd.DataFrame:
+
+    # bounds: (south, west, north, east)
+    levels = load_tiles(path)
+    if not levels:
+        return pd.DataFrame(columns=COLUMNS)
+    wanted = precision_for_zoom(zoom)
+    tiles = levels.get(wanted)
+    if tiles is None:
+        tiles = levels[min(levels, key=lambda p: abs(p - wanted))]
+    if bounds is not None:
+        south, west, north, east = bounds
+        tiles = tiles[tiles['lat'].between(south, north) & tiles['lng'].between(west, east)]
+    return tiles
+
+
+def heat_points(zoom: float, bounds: tuple = None, path: str = TILES_FILE) -> list:
+
+    # [lat, lng, weight] per tile; log-scaled so a few dense city tiles don't
+    # wash out the rest of the country
+    tiles = tiles_for(zoom, bounds, path)
+    if tiles.empty:
+        return []
+    weight = np.log1p(tiles['count'].to_numpy(dtype=float))
+    weight = weight / weight.max()
+    return np.column_stack([tiles['lat'], tiles['lng'], weight.round(3)]).tolist()
+
+
+def around(lat: float, lng: float, radius_km: float) -> tuple:
+    # Bounding box for a radius; fine at Korean latitudes
+    dlat = radius_km / 111.0
+    dlng = radius_km / (111.0 * np.cos(np.radians(lat)))
+    return lat - dlat, lng - dlng, lat + dlat, lng + dlng
+
+
+def add_heat_layer(m, zoom: float, bounds: tuple = None, path: str = TILES_FILE) -> bool:
+
+    # folium pages: one HeatMap layer next to the markers, toggled from the layer control
+    points = heat_points(zoom, bounds, path)
+    if not points:
+        return False
+    from folium.plugins import HeatMap
+    HeatMap(points, name="맛집 밀도", min_opacity=0.3, radius=25, blur=18).add_to(m)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전국 맛집을 geohash 타일로 묶어 밀도/평점 타일 파일을 만듭니다")
+    parser.add_argument('dataset', nargs='?', default=NATIONAL_DATASET)
+    parser.add_argument('-o', '--output', default=TILES_FILE)
+    parser.add_argument('--precisions', type=int, nargs='+', default=list(PRECISIONS), help="geohash 길이 목록")
+    parser.add_argument('--top-k', type=int, default=TOP_K)
+    args = parser.parse_args()
+
+    df = load_national(args.dataset)
+    try:
+        tiles = build_tiles(df, args.precisions, args.top_k)
+    except ValueError as e:
+        parser.error(str(e))
+    save_tiles(tiles, args.output)
+    counts = ', '.join(f"{p}자리 {len(level['geohash'])}개" for p, level in tiles['levels'].items())
+    print(f"맛집 {tiles['restaurants']}곳 -> 타일 {counts}")
+    print(f"저장 완료: {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
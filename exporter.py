@@ -0,0 +1,123 @@
+import os
+import hashlib
+import argparse
+import tempfile
+
+import pandas as pd
+
+from cache_backend import cache, make_key
+from config import env
+
+# -----------------------------------------------------------------------------
+# 결과 내보내기 (CSV / XLSX / Parquet)
+# -----------------------------------------------------------------------------
+FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', '.xlsx'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+}
+CHUNK_ROWS = 50_000
+EXPORT_TTL = int(env("EXPORT_TTL", "3600"))
+# Exports larger than this are spooled to disk while they are being written
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+
+def exportable(df: pd.DataFrame) -> pd.DataFrame:
+
+    # Nested API payloads (photos, ...) don't belong in a flat file
+    nested = [
+        col for col in df.columns
+        if df[col].dtype == object and df[col].map(lambda v: isinstance(v, (list, dict))).any()
+    ]
+    return df.drop(columns=nested)
+
+
+def result_hash(df: pd.DataFrame) -> str:
+    digest = hashlib.sha1(repr(list(df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _iter_chunks(df: pd.DataFrame, chunk_rows: int):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df: pd.DataFrame, f, chunk_rows: int = CHUNK_ROWS):
+    # utf-8-sig so Excel opens Korean text correctly, as the collectors do
+    f.write('\ufeff'.encode('utf-8'))
+    # Header goes out before the rows so an empty result still has its columns
+    f.write(df.head(0).to_csv(index=False).encode('utf-8'))
+    for chunk in _iter_chunks(df, chunk_rows):
+        f.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+
+
+def write_xlsx(df: pd.DataFrame, f, chunk_rows: int = CHUNK_ROWS):
+    from openpyxl import Workbook
+    # Write-only mode streams rows out instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([str(col) for col in df.columns])
+    for chunk in _iter_chunks(df, chunk_rows):
+        for row in chunk.itertuples(index=False, name=None):
+            sheet.append([None if pd.isna(v) else v for v in row])
+    workbook.save(f)
+
+
+def write_parquet(df: pd.DataFrame, f, chunk_rows: int = CHUNK_ROWS):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    # One row group per chunk keeps peak memory at one chunk
+    with pq.ParquetWriter(f, schema, compression='zstd') as writer:
+        for chunk in _iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+WRITERS = {'csv': write_csv, 'xlsx': write_xlsx, 'parquet': write_parquet}
+
+
+def prepare_export(df: pd.DataFrame, fmt: str) -> str:
+
+    # Generated once per distinct result set and format; returns the cache key
+    df = exportable(df)
+    key = make_key('export_bytes', result_hash(df), fmt)
+    if cache.get(key) is None:
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as f:
+            WRITERS[fmt](df, f)
+            f.seek(0)
+            cache.set(key, f.read(), ttl=EXPORT_TTL)
+    return key
+
+
+def cached_export(key: str):
+    return cache.get(key) if key else None
+
+
+def export_file(df: pd.DataFrame, path: str, fmt: str = None, chunk_rows: int = CHUNK_ROWS):
+
+    # Large national exports go straight to disk, chunk by chunk
+    fmt = fmt or os.path.splitext(path)[1].lstrip('.').lower()
+    with open(path, 'wb') as f:
+        WRITERS[fmt](exportable(df), f, chunk_rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집한 관광지/맛집 엑셀을 CSV, XLSX, Parquet 으로 변환")
+    parser.add_argument('source', help="입력 파일 (.xlsx / .csv)")
+    parser.add_argument('target', help="출력 파일 (.csv / .xlsx / .parquet)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    if args.source.endswith('.csv'):
+        df = pd.read_csv(args.source)
+    else:
+        df = pd.read_excel(args.source)
+    fmt = os.path.splitext(args.target)[1].lstrip('.').lower()
+    if fmt not in WRITERS:
+        parser.error(f"지원하지 않는 형식입니다: {fmt}")
+    export_file(df, args.target, fmt, args.chunk_rows)
+    print(f"저장 완료: {args.target} ({len(df)}행)")
+
+
+if __name__ == "__main__":
+    main()
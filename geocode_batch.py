@@ -0,0 +1,150 @@
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from cache_backend import SqliteBackend, make_key
+from tour_core import google_get, _first_location, GOOGLE_API_BASE
+from api_usage import usage
+import address
+from config import env
+
+# -----------------------------------------------------------------------------
+# 주소 일괄 좌표 변환 설정
+# -----------------------------------------------------------------------------
+google_key = env("Google_key")
+
+# Same endpoint (and mock/replay overrides) as tour_core.get_lat_lng
+GEOCODE_URL = f"{GOOGLE_API_BASE}/maps/api/geocode/json"
+GEOCODE_CACHE = env("GEOCODE_CACHE", "geocode_cache.sqlite")
+# Geocoding API allows 50 QPS per project; stay well below it by default
+DEFAULT_QPS = 10.0
+DEFAULT_WORKERS = 8
+# Address columns used by the collected sheets, in lookup order
+ADDRESS_COLUMNS = ('주소', '관광지주소', '맛집주소')
+
+
+class RateLimiter:
+    """초당 요청 수 제한 (스레드 공유)"""
+
+    def __init__(self, qps: float):
+        self.interval = 1.0 / qps
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class BatchGeocoder:
+    """중복 제거 → 캐시 조회 → 남은 주소만 병렬 조회"""
+
+    def __init__(self, api_key: str, cache_path: str = GEOCODE_CACHE,
+                 qps: float = DEFAULT_QPS, workers: int = DEFAULT_WORKERS):
+        self.api_key = api_key
+        self.cache = SqliteBackend(cache_path)
+        self.limiter = RateLimiter(qps)
+        self.workers = workers
+        self.stats = {'unique': 0, 'cached': 0, 'fetched': 0, 'failed': 0}
+
+    def _fetch(self, cleaned: str):
+        self.limiter.wait()
+        params = {'address': cleaned, 'language': 'ko', 'key': self.api_key}
+        # Through the shared fetch layer: usage counters, daily budget and record/replay
+        res = google_get('geocode', GEOCODE_URL, params, project=_first_location)
+        if res is None:
+            return cleaned, None, False
+        status = res.get('status')
+        if status == 'OK' and res.get('location'):
+            return cleaned, tuple(res['location']), True
+        # ZERO_RESULTS is a real answer and worth remembering; quota/transient errors are not
+        return cleaned, None, status == 'ZERO_RESULTS'
+
+    def geocode(self, addresses) -> dict:
+
+        # Spellings that parse to the same canonical key share one lookup;
+        # the first cleaned spelling seen is the one sent to Google
+        unique = {}
+        for value in addresses:
+            cleaned = address.clean(value)
+            if cleaned:
+                unique.setdefault(address.canonical_key(cleaned), cleaned)
+        self.stats['unique'] = len(unique)
+        results = {}
+        missing = {}
+        for key, cleaned in unique.items():
+            cached = self.cache.get(make_key('geocode', key))
+            if cached is not None:
+                results[key] = tuple(cached['latlng']) if cached['latlng'] else None
+                self.stats['cached'] += 1
+            else:
+                missing[cleaned] = key
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for cleaned, latlng, final in pool.map(self._fetch, missing):
+                key = missing[cleaned]
+                results[key] = latlng
+                if final:
+                    self.cache.set(make_key('geocode', key), {'latlng': latlng})
+                self.stats['fetched' if latlng else 'failed'] += 1
+        return results
+
+
+def add_coordinates(df: pd.DataFrame, address_col: str, geocoder: BatchGeocoder) -> pd.DataFrame:
+
+    # 맛집주소 -> 맛집위도/맛집경도; any other address (관광지주소, 주소) -> 위도/경도,
+    # the columns records.from_sheet and national_data.SCHEMA read
+    prefix = '맛집' if address_col == '맛집주소' else ''
+    keys = df[address_col].map(address.canonical_key)
+    results = geocoder.geocode(df[address_col])
+    coords = keys.map(lambda k: results.get(k) or (None, None))
+    return df.assign(**{
+        f'{prefix}위도': coords.map(lambda c: c[0]),
+        f'{prefix}경도': coords.map(lambda c: c[1]),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엑셀/CSV 주소 열에 위도·경도 열을 추가합니다")
+    parser.add_argument('source', help="입력 파일 (.xlsx / .csv)")
+    parser.add_argument('-o', '--output', help="출력 파일 (기본: <입력>_좌표.<확장자>)")
+    parser.add_argument('--address-col', help=f"주소 열 이름 (기본: {', '.join(ADDRESS_COLUMNS)} 중 첫 번째)")
+    parser.add_argument('--qps', type=float, default=DEFAULT_QPS)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--cache', default=GEOCODE_CACHE)
+    args = parser.parse_args()
+
+    if not google_key:
+        parser.error(".env 파일에 'Google_key'가 설정되지 않았습니다.")
+    base, ext = os.path.splitext(args.source)
+    df = pd.read_csv(args.source) if ext == '.csv' else pd.read_excel(args.source)
+    address_col = args.address_col or next((c for c in ADDRESS_COLUMNS if c in df.columns), None)
+    if address_col not in df.columns:
+        parser.error(f"주소 열을 찾을 수 없습니다: {list(df.columns)}")
+
+    # The per-session budget guards app visitors; this job is bounded by the
+    # daily budget and --qps
+    usage.session_budget = 0
+    geocoder = BatchGeocoder(google_key, args.cache, args.qps, args.workers)
+    df = add_coordinates(df, address_col, geocoder)
+    output = args.output or f"{base}_좌표{ext}"
+    if output.endswith('.csv'):
+        df.to_csv(output, index=False, encoding='utf-8-sig')
+    else:
+        df.to_excel(output, index=False)
+    stats = geocoder.stats
+    print(f"행 {len(df)}개 / 고유 주소 {stats['unique']}개: "
+          f"캐시 {stats['cached']}, 새로 조회 {stats['fetched']}, 실패 {stats['failed']}")
+    print(f"저장 완료: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import os
+import io
+import time
+import base64
+import hashlib
+import threading
+
+from config import env
+
+# -----------------------------------------------------------------------------
+# 카드 이미지 설정
+# -----------------------------------------------------------------------------
+# Cards show photos in a ~260 x 150 CSS px box (5 columns, layout="wide")
+CARD_CSS_WIDTH = int(env("CARD_IMAGE_CSS_WIDTH", "260"))
+CARD_CSS_HEIGHT = 150
+DEVICE_PIXEL_RATIO = float(env("CARD_IMAGE_DPR", "1.5"))
+# Widths we ask Google for; a few fixed buckets keep cache keys shared
+PHOTO_WIDTH_BUCKETS = (160, 240, 320, 400, 480, 640, 800)
+WEBP_BYTE_BUDGET = int(env("CARD_IMAGE_BYTE_BUDGET", "20000"))
+WEBP_QUALITIES = (80, 70, 60, 50, 40)
+PLACEHOLDER_WIDTH = 16
+# Served by Streamlit static file serving (server.enableStaticServing)
+STATIC_SERVING = env("CARD_IMAGE_STATIC", "1") == "1"
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'photos')
+STATIC_URL = "app/static/photos"
+# Published files unused for this long are deleted; longer than the app's
+# PHOTO_TTL so a cached card never points at a missing file
+STATIC_MAX_AGE = int(env("CARD_IMAGE_STATIC_MAX_AGE", str(2 * 24 * 3600)))
+# Backstop for the whole directory; oldest files go first
+STATIC_MAX_BYTES = int(env("CARD_IMAGE_STATIC_MAX_BYTES", str(512 * 1024 * 1024)))
+# The directory is swept at most this often
+STATIC_SWEEP_INTERVAL = 600
+_sweep_lock = threading.Lock()
+_last_sweep = 0.0
+
+
+def photo_request_width(css_width: int = CARD_CSS_WIDTH, dpr: float = DEVICE_PIXEL_RATIO) -> int:
+
+    # Smallest bucket that still covers the box at the device pixel ratio
+    needed = css_width * dpr
+    for width in PHOTO_WIDTH_BUCKETS:
+        if width >= needed:
+            return width
+    return PHOTO_WIDTH_BUCKETS[-1]
+
+
+def _crop_to_box(image, width: int, height: int):
+
+    # Centre-crop to the box aspect ratio (object-fit: cover), then downscale
+    from PIL import Image
+    src_w, src_h = image.size
+    box_ratio = width / height
+    if src_w / src_h > box_ratio:
+        crop_w = round(src_h * box_ratio)
+        left = (src_w - crop_w) // 2
+        image = image.crop((left, 0, left + crop_w, src_h))
+    else:
+        crop_h = round(src_w / box_ratio)
+        top = (src_h - crop_h) // 2
+        image = image.crop((0, top, src_w, top + crop_h))
+    if image.size[0] > width:
+        image = image.resize((width, height), Image.LANCZOS)
+    return image
+
+
+def transcode(content: bytes, css_width: int = CARD_CSS_WIDTH, css_height: int = CARD_CSS_HEIGHT,
+              dpr: float = DEVICE_PIXEL_RATIO, byte_budget: int = WEBP_BYTE_BUDGET):
+
+    # Returns (webp bytes, tiny blurred data URI placeholder)
+    from PIL import Image
+    image = Image.open(io.BytesIO(content))
+    image = image.convert('RGB')
+    width = round(css_width * dpr)
+    height = round(css_height * dpr)
+    image = _crop_to_box(image, width, height)
+    webp = b''
+    # Step quality down until the image fits the byte budget
+    for quality in WEBP_QUALITIES:
+        buf = io.BytesIO()
+        image.save(buf, format='WEBP', quality=quality, method=4)
+        webp = buf.getvalue()
+        if len(webp) <= byte_budget:
+            break
+    thumb = image.resize(
+        (PLACEHOLDER_WIDTH, max(1, round(PLACEHOLDER_WIDTH * image.size[1] / image.size[0]))),
+        Image.BILINEAR,
+    )
+    buf = io.BytesIO()
+    thumb.save(buf, format='WEBP', quality=30)
+    placeholder = "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode()
+    return webp, placeholder
+
+
+def publish(webp: bytes) -> str:
+
+    # Static files let the browser lazy-load and cache images instead of
+    # receiving them inlined in every rerun's HTML
+    if not STATIC_SERVING:
+        return "data:image/webp;base64," + base64.b64encode(webp).decode()
+    name = hashlib.sha1(webp).hexdigest() + ".webp"
+    path = os.path.join(STATIC_DIR, name)
+    if os.path.exists(path):
+        # mtime is the last publish, which is what the sweep ages files by
+        os.utime(path)
+    else:
+        os.makedirs(STATIC_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(webp)
+        os.replace(tmp_path, path)
+    sweep_static()
+    return f"{STATIC_URL}/{name}"
+
+
+def sweep_static(now: float = None, force: bool = False) -> int:
+
+    # Deletes published files past STATIC_MAX_AGE, then the oldest ones while
+    # the directory is over STATIC_MAX_BYTES. Returns the number removed.
+    global _last_sweep
+    now = time.time() if now is None else now
+    with _sweep_lock:
+        if not force and now - _last_sweep < STATIC_SWEEP_INTERVAL:
+            return 0
+        _last_sweep = now
+    try:
+        entries = [e for e in os.scandir(STATIC_DIR) if e.is_file() and e.name.endswith('.webp')]
+    except FileNotFoundError:
+        return 0
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in files:
+        if now - mtime <= STATIC_MAX_AGE and total <= STATIC_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,154 @@
+import numpy as np
+
+# -----------------------------------------------------------------------------
+# 하루 여행 코스 (방문 순서 최적화 + 식사 시간 맛집 삽입)
+# -----------------------------------------------------------------------------
+EARTH_RADIUS_KM = 6371.0
+# Scheduling assumptions for the day plan
+DAY_START = 9 * 60
+DAY_END = 21 * 60
+VISIT_MINUTES = 90
+MEAL_MINUTES = 60
+SPEED_KMH = 30.0
+# Road distance is longer than the great-circle one; a common rule-of-thumb factor
+DETOUR_FACTOR = 1.3
+MEAL_TIMES = {'점심': 12 * 60, '저녁': 18 * 60}
+# Only the best few restaurants near the meal stop are considered
+MEAL_CANDIDATES = 10
+MAX_2OPT_PASSES = 20
+
+
+def haversine_matrix(lat, lng) -> np.ndarray:
+
+    # All pairwise great-circle distances (km) in one broadcasted pass
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lng = np.radians(np.asarray(lng, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_to(lat: float, lng: float, lats, lngs) -> np.ndarray:
+    return haversine_matrix(np.append(lats, lat), np.append(lngs, lng))[-1, :-1]
+
+
+def nearest_neighbour(dist: np.ndarray, start: int = 0) -> np.ndarray:
+    n = len(dist)
+    order = np.empty(n, dtype=int)
+    visited = np.zeros(n, dtype=bool)
+    order[0], visited[start] = start, True
+    for i in range(1, n):
+        row = np.where(visited, np.inf, dist[order[i - 1]])
+        order[i] = int(np.argmin(row))
+        visited[order[i]] = True
+    return order
+
+
+def path_length(dist: np.ndarray, order) -> float:
+    order = np.asarray(order)
+    return float(dist[order[:-1], order[1:]].sum())
+
+
+def two_opt(dist: np.ndarray, order: np.ndarray, max_passes: int = MAX_2OPT_PASSES) -> np.ndarray:
+
+    # Open path with a fixed first stop: reversing order[i..j] swaps edges
+    # (i-1, i) + (j, j+1) for (i-1, j) + (i, j+1). Every j for a given i is
+    # scored at once; the last stop has no outgoing edge.
+    order = order.copy()
+    n = len(order)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            j = np.arange(i + 1, n)
+            a, b, c = order[i - 1], order[i], order[j]
+            nxt = np.where(j + 1 < n, order[np.minimum(j + 1, n - 1)], -1)
+            has_next = nxt >= 0
+            before = dist[a, b] + np.where(has_next, dist[c, np.maximum(nxt, 0)], 0.0)
+            after = dist[a, c] + np.where(has_next, dist[b, np.maximum(nxt, 0)], 0.0)
+            gain = before - after
+            best = int(np.argmax(gain))
+            if gain[best] > 1e-9:
+                k = j[best]
+                order[i:k + 1] = order[i:k + 1][::-1]
+                improved = True
+        if not improved:
+            break
+    return order
+
+
+def solve_order(lat, lng, start: int = 0) -> np.ndarray:
+    dist = haversine_matrix(lat, lng)
+    return two_opt(dist, nearest_neighbour(dist, start))
+
+
+def _clock(minutes: float) -> str:
+    minutes = int(round(minutes))
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _travel_minutes(km: float, speed_kmh: float) -> float:
+    return km * DETOUR_FACTOR / speed_kmh * 60
+
+
+def _pick_meal(prev: dict, nxt, options: list, used: set):
+
+    # Cheapest insertion between prev and next among the top-rated options
+    options = [o for o in options if o.get('name') not in used
+               and o.get('lat') is not None and o.get('lng') is not None][:MEAL_CANDIDATES]
+    if not options:
+        return None
+    lats = np.array([o['lat'] for o in options], dtype=float)
+    lngs = np.array([o['lng'] for o in options], dtype=float)
+    detour = haversine_to(prev['lat'], prev['lng'], lats, lngs)
+    if nxt is not None:
+        detour = detour + haversine_to(nxt['lat'], nxt['lng'], lats, lngs)
+    return options[int(np.argmin(detour))]
+
+
+def plan_itinerary(stops: list, meal_options=None, start: int = 0, day_start: int = DAY_START,
+                   visit_minutes: int = VISIT_MINUTES, speed_kmh: float = SPEED_KMH) -> dict:
+
+    # stops: dicts with name/lat/lng. meal_options(stop) returns restaurant
+    # dicts (name/lat/lng, best first) near a stop, or None to skip meals.
+    stops = [s for s in stops if s.get('lat') is not None and s.get('lng') is not None]
+    if not stops:
+        return {'stops': [], 'days': 0, 'total_km': 0.0, 'order': []}
+    lat = np.array([s['lat'] for s in stops], dtype=float)
+    lng = np.array([s['lng'] for s in stops], dtype=float)
+    order = solve_order(lat, lng, min(start, len(stops) - 1))
+
+    plan, used = [], set()
+    meals = sorted(MEAL_TIMES.items(), key=lambda m: m[1])
+    clock, total_km, prev, day = float(day_start), 0.0, None, 1
+    for idx in order:
+        stop = dict(stops[idx], kind='관광지')
+        # A meal is due once the clock passes its time; it goes right after the previous stop
+        while prev is not None and meals and clock >= meals[0][1] and meal_options is not None:
+            label, _ = meals.pop(0)
+            meal = _pick_meal(prev, stop, meal_options(prev) or [], used)
+            if meal is None:
+                continue
+            used.add(meal.get('name'))
+            km = float(haversine_to(prev['lat'], prev['lng'], [meal['lat']], [meal['lng']])[0])
+            clock += _travel_minutes(km, speed_kmh)
+            total_km += km
+            plan.append(dict(meal, kind=label, day=day, arrive=_clock(clock),
+                             depart=_clock(clock + MEAL_MINUTES), leg_km=round(km, 2)))
+            clock += MEAL_MINUTES
+            prev = meal
+        km = 0.0 if prev is None else float(haversine_to(prev['lat'], prev['lng'], [stop['lat']], [stop['lng']])[0])
+        travel = _travel_minutes(km, speed_kmh)
+        # Long plans roll over to the next morning, continuing from the last stop;
+        # the visit has to end by DAY_END including the drive there
+        if clock + travel + visit_minutes > DAY_END and prev is not None:
+            day += 1
+            clock = float(day_start)
+            meals = sorted(MEAL_TIMES.items(), key=lambda m: m[1])
+        clock += travel
+        total_km += km
+        plan.append(dict(stop, day=day, arrive=_clock(clock), depart=_clock(clock + visit_minutes),
+                         leg_km=round(km, 2)))
+        clock += visit_minutes
+        prev = stop
+    return {'stops': plan, 'days': day, 'total_km': round(total_km, 2), 'order': [int(i) for i in order]}
@@ -0,0 +1,58 @@
+import os
+import math
+
+import streamlit.components.v1 as components
+
+# -----------------------------------------------------------------------------
+# 카카오맵 컴포넌트 (SDK 한 번 로드, 마커는 id 기준으로 바뀐 것만 반영)
+# -----------------------------------------------------------------------------
+_FRONTEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'frontend', 'kakao_map')
+_component = components.declare_component('kakao_map', path=_FRONTEND)
+
+DEFAULT_HEIGHT = 500
+# Map levels from which nearby markers are merged into clusters (1 = closest)
+CLUSTER_MIN_LEVEL = 6
+
+
+def _coord(value):
+    # NaN/None coordinates (failed geocodes) can't be placed or sent as JSON
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) else value
+
+
+def marker(marker_id, lat, lng, title: str, subtitle: str = '', show_info: bool = False,
+           badge: str = None, color: str = None):
+
+    # badge: a labelled overlay (itinerary stops) instead of a clustered pin
+    lat, lng = _coord(lat), _coord(lng)
+    if lat is None or lng is None:
+        return None
+    return {'id': str(marker_id), 'lat': lat, 'lng': lng, 'title': str(title), 'subtitle': str(subtitle or ''),
+            'open': bool(show_info), 'badge': badge, 'color': color}
+
+
+def circle(lat, lng, radius: float, opacity: float, color: str = None) -> dict:
+    return {'lat': float(lat), 'lng': float(lng), 'radius': float(radius), 'opacity': float(opacity), 'color': color}
+
+
+def kakao_map(app_key: str, lat: float, lng: float, markers=(), level: int = 4, circles=(), path=(),
+              fit: bool = False, height: int = DEFAULT_HEIGHT, key: str = None):
+
+    # A stable key keeps one iframe (and one SDK load) across reruns; changed
+    # arguments arrive as a render message and only the marker diff is drawn.
+    # Returns {'clicked': marker id, 'n': click count} after a marker click.
+    return _component(
+        appKey=app_key,
+        center={'lat': float(lat), 'lng': float(lng)},
+        level=level,
+        markers=[m for m in markers if m is not None],
+        circles=list(circles),
+        path=[[float(p[0]), float(p[1])] for p in path],
+        fit=fit,
+        clusterMinLevel=CLUSTER_MIN_LEVEL,
+        height=height,
+        key=key,
+        default=None,
+    )
@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_upstream import MockUpstream
+
+# -----------------------------------------------------------------------------
+# 동시 세션 부하 테스트 (python loadtest.py --sessions 1 10 50)
+# -----------------------------------------------------------------------------
+# Every session runs the same script in this process, sharing caches and
+# singleflight exactly like sessions on one Streamlit server do
+APP_SCRIPT = "streamlit_MATtour_top5tour.py"
+# Queries are drawn from this pool so sessions overlap the way real users do
+REGIONS = ['제주', '부산', '서울', '강릉', '경주', '전주', '여수', '속초', '대구', '인천']
+APP_TIMEOUT = 60.0
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def rss_mb() -> float:
+
+    # Current resident set size; ru_maxrss (peak) where /proc is unavailable
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+def _configure_env(base_url: str):
+
+    # Must run before any repo module is imported: they read these at import time
+    os.environ['GOOGLE_API_BASE'] = base_url
+    os.environ.setdefault('Google_key', 'loadtest')
+    os.environ.setdefault('KAKAO_KEY', 'loadtest')
+    os.environ.setdefault('PAGE_TOKEN_DELAY', '0.05')
+    # Budgets would otherwise start degrading the run halfway through
+    os.environ.setdefault('API_SESSION_BUDGET', '100000')
+    os.environ.setdefault('API_DAILY_BUDGET', '100000000')
+    os.environ.setdefault('TRACE_ENABLED', '0')
+
+
+def run_session(session_no: int, rng: random.Random, interactions: int, latencies: dict, errors: list):
+
+    from streamlit.testing.v1 import AppTest
+
+    # One user: open the page, search, pick an attraction, then change their mind
+    def timed(step: str, action):
+        start = time.perf_counter()
+        at = action()
+        latencies.setdefault(step, []).append((time.perf_counter() - start) * 1000)
+        if at.exception:
+            errors.append(f"session {session_no} {step}: {at.exception[0].message}")
+        return at
+
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=APP_TIMEOUT)
+    at = timed('open', at.run)
+    at.text_input[0].input(rng.choice(REGIONS))
+    at = timed('search', at.button[0].click().run)
+    for _ in range(interactions):
+        if not at.selectbox:
+            break
+        at.selectbox[0].select(rng.choice(at.selectbox[0].options))
+        at = timed('select', at.run)
+
+
+def run(concurrency: int, interactions: int, seed: int) -> dict:
+
+    latencies, errors = {}, []
+    peak = [rss_mb()]
+    stop = threading.Event()
+
+    def sample_rss():
+        while not stop.wait(0.2):
+            peak[0] = max(peak[0], rss_mb())
+
+    sampler = threading.Thread(target=sample_rss, daemon=True)
+    sampler.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(run_session, i, random.Random(seed + i), interactions, latencies, errors)
+            for i in range(concurrency)
+        ]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+    elapsed = time.perf_counter() - started
+    stop.set()
+    sampler.join()
+    every = [ms for values in latencies.values() for ms in values]
+    return {
+        'sessions': concurrency,
+        'interactions': len(every),
+        'throughput': len(every) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(every, 50),
+        'p95_ms': percentile(every, 95),
+        'p99_ms': percentile(every, 99),
+        'steps': {
+            step: {'p50_ms': percentile(v, 50), 'p95_ms': percentile(v, 95), 'count': len(v)}
+            for step, v in latencies.items()
+        },
+        'rss_mb': rss_mb(),
+        'peak_rss_mb': peak[0],
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모의 Google API 로 동시 세션 부하를 재현합니다")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 10, 50])
+    parser.add_argument('--interactions', type=int, default=3, help="세션당 관광지 선택 횟수")
+    parser.add_argument('--latency-scale', type=float, default=1.0, help="모의 API 지연 배율 (0 = 지연 없음)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="결과를 JSON 파일로 저장 (실행 간 비교용)")
+    args = parser.parse_args()
+
+    upstream = MockUpstream(latency_scale=args.latency_scale).start()
+    _configure_env(upstream.base_url)
+    results = []
+    print(f"{'sess':>5} {'ops':>6} {'ops/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'rss MB':>8} {'peak':>8} {'err':>4}")
+    try:
+        for concurrency in args.sessions:
+            r = run(concurrency, args.interactions, args.seed)
+            r['upstream_calls'] = dict(upstream.counts)
+            results.append(r)
+            print(f"{r['sessions']:>5} {r['interactions']:>6} {r['throughput']:>7.2f} {r['p50_ms']:>8.1f} "
+                  f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['rss_mb']:>8.1f} {r['peak_rss_mb']:>8.1f} "
+                  f"{len(r['errors']):>4}")
+            for error in r['errors'][:3]:
+                print(f"      ! {error}")
+    finally:
+        upstream.stop()
+    print(f"모의 API 호출 수 (누적): {upstream.counts}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.time(), 'args': vars(args), 'results': results}, f,
+                      ensure_ascii=False, indent=2)
+        print(f"저장 완료: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
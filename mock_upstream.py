@@ -0,0 +1,173 @@
+import io
+import json
+import time
+import random
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# -----------------------------------------------------------------------------
+# Google Places/Geocoding 모의 서버 (부하 테스트, 로컬 개발용)
+# -----------------------------------------------------------------------------
+# Rough production latencies (seconds) per endpoint: (mean, jitter)
+DEFAULT_LATENCY = {
+    'textsearch': (0.35, 0.15),
+    'geocode': (0.12, 0.05),
+    'nearby': (0.30, 0.10),
+    'details': (0.25, 0.10),
+    'photo': (0.20, 0.10),
+}
+PAGE_SIZE = 20
+PAGES = 3
+
+
+def _seed(*parts) -> random.Random:
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def _place(rng: random.Random, prefix: str, idx: int, lat: float, lng: float) -> dict:
+    place_id = f"mock-{prefix}-{idx}"
+    return {
+        'place_id': place_id,
+        'name': f"{prefix} {idx + 1}",
+        'formatted_address': f"제주특별자치도 제주시 모의로 {idx + 1}",
+        'vicinity': f"제주시 모의로 {idx + 1}",
+        'rating': round(rng.uniform(3.5, 5.0), 1),
+        'user_ratings_total': rng.randint(10, 5000),
+        'geometry': {'location': {'lat': lat + rng.uniform(-0.05, 0.05), 'lng': lng + rng.uniform(-0.05, 0.05)}},
+        'photos': [{'photo_reference': f"photo-{place_id}", 'height': 800, 'width': 1200}],
+        'types': ['tourist_attraction', 'point_of_interest'],
+    }
+
+
+def _jpeg_bytes() -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        # Not a decodable image; the app falls back to serving the bytes as-is
+        return b'\xff\xd8\xff\xe0' + b'\x00' * 20000 + b'\xff\xd9'
+    image = Image.new('RGB', (800, 533), (120, 160, 200))
+    buf = io.BytesIO()
+    image.save(buf, format='JPEG', quality=85)
+    return buf.getvalue()
+
+
+class MockUpstream:
+    """결정적 가짜 응답과 지연을 돌려주는 로컬 HTTP 서버"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: dict = None, latency_scale: float = 1.0):
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.latency_scale = latency_scale
+        self.counts = {name: 0 for name in DEFAULT_LATENCY}
+        self._lock = threading.Lock()
+        self._photo = _jpeg_bytes()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'MockUpstream':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _sleep(self, endpoint: str):
+        mean, jitter = self.latency[endpoint]
+        time.sleep(max(0.0, random.gauss(mean, jitter)) * self.latency_scale)
+        with self._lock:
+            self.counts[endpoint] += 1
+
+    # -- responses ------------------------------------------------------------
+    def textsearch(self, params: dict) -> dict:
+        token = params.get('pagetoken')
+        if token:
+            query, page = token.rsplit('|', 1)
+            page = int(page)
+        else:
+            query, page = params.get('query', ''), 0
+        rng = _seed('textsearch', query, page)
+        results = [_place(rng, query.replace(' 관광지', ''), page * PAGE_SIZE + i, 33.45, 126.55)
+                   for i in range(PAGE_SIZE)]
+        payload = {'status': 'OK', 'results': results}
+        if page + 1 < PAGES:
+            payload['next_page_token'] = f"{query}|{page + 1}"
+        return payload
+
+    def nearby(self, params: dict) -> dict:
+        lat, lng = map(float, params.get('location', '33.45,126.55').split(','))
+        rng = _seed('nearby', params.get('location'))
+        results = []
+        for i in range(20):
+            place = _place(rng, '맛집', i, lat, lng)
+            place['vicinity'] = f"제주시 맛집로 {i + 1}"
+            results.append(place)
+        return {'status': 'OK', 'results': results}
+
+    def details(self, params: dict) -> dict:
+        rng = _seed('details', params.get('place_id'))
+        reviews = [
+            {'author_name': f"리뷰어{i}", 'text': "정말 좋은 곳이었습니다. " * rng.randint(1, 6),
+             'time': 1700000000 + rng.randint(0, 10 ** 7), 'rating': rng.randint(3, 5)}
+            for i in range(5)
+        ]
+        return {'status': 'OK', 'result': {'reviews': reviews}}
+
+    def geocode(self, params: dict) -> dict:
+        rng = _seed('geocode', params.get('address'))
+        location = {'lat': 33.0 + rng.random(), 'lng': 126.0 + rng.random()}
+        return {'status': 'OK', 'results': [{'geometry': {'location': location}}]}
+
+    def _handler_class(self):
+        mock = self
+        routes = {
+            '/maps/api/place/textsearch/json': ('textsearch', mock.textsearch),
+            '/maps/api/place/nearbysearch/json': ('nearby', mock.nearby),
+            '/maps/api/place/details/json': ('details', mock.details),
+            '/maps/api/geocode/json': ('geocode', mock.geocode),
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path == '/maps/api/place/photo':
+                    mock._sleep('photo')
+                    body, content_type = mock._photo, 'image/jpeg'
+                elif url.path in routes:
+                    endpoint, handler = routes[url.path]
+                    mock._sleep(endpoint)
+                    body = json.dumps(handler(params), ensure_ascii=False).encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    server = MockUpstream(port=8765).start()
+    print(f"모의 서버 실행 중: {server.base_url} (GOOGLE_API_BASE 로 지정하세요)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
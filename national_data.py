@@ -0,0 +1,178 @@
+import os
+import argparse
+from itertools import islice
+from importlib.util import find_spec
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# -----------------------------------------------------------------------------
+# 전국 관광지/맛집 데이터 로더 (열 타입 스키마 적용)
+# -----------------------------------------------------------------------------
+NATIONAL_DATASET = "전국_관광지_맛집리스트.xlsx"
+# Regions the national crawl searched, as they appear in the 지역 column
+REGIONS = [
+    '서울', '부산', '대구', '인천', '광주', '대전', '울산',
+    '세종', '경기도', '강원도', '충청북도', '충청남도',
+    '전라북도', '전라남도', '경상북도', '경상남도', '제주도',
+]
+CHUNK_ROWS = 100_000
+# Only checked for here: pandas imports pyarrow itself when the dtype is first used
+TEXT = 'string[pyarrow]' if find_spec('pyarrow') is not None else 'string'
+
+# Every restaurant row repeats its attraction's columns, so those are
+# categoricals; free text is Arrow-backed; numbers are the narrowest that fit
+SCHEMA = {
+    '지역': 'category',
+    '관광지명': 'category',
+    '관광지주소': 'category',
+    '관광지평점': 'float32',
+    '관광지리뷰수': 'Int32',
+    '맛집명': TEXT,
+    '맛집주소': TEXT,
+    '맛집거리(m)': 'Int32',
+    '맛집전화번호': TEXT,
+    '맛집평점': 'float32',
+    '맛집리뷰수': 'Int32',
+    '카카오맵 URL': TEXT,
+    # Added by geocode_batch.py
+    '위도': 'float32',
+    '경도': 'float32',
+    '맛집위도': 'float32',
+    '맛집경도': 'float32',
+}
+NUMERIC = ('float32', 'Int32')
+
+
+def apply_schema(df: pd.DataFrame, schema: dict = SCHEMA) -> pd.DataFrame:
+
+    # Columns outside the schema are left as they are
+    converted = {}
+    for col, dtype in schema.items():
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if dtype in NUMERIC:
+            # Kakao returns distances as strings; blanks and '없음' become missing
+            values = pd.to_numeric(values, errors='coerce')
+            if dtype == 'Int32':
+                values = values.round()
+        converted[col] = values.astype(dtype)
+    return df.assign(**converted)
+
+
+def manifest_path(dataset: str) -> str:
+    # Written by national_refresh.py next to the dataset (per-attraction fingerprints)
+    return os.path.splitext(dataset)[0] + '.manifest.json'
+
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True, index=False).sum())
+
+
+def concat_frames(frames: list) -> pd.DataFrame:
+
+    # pd.concat falls back to object when categories differ between chunks;
+    # union_categoricals merges them without materialising the strings
+    frames = [f for f in frames if len(f)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    columns = list(dict.fromkeys(col for f in frames for col in f.columns))
+    frames = [f.reindex(columns=columns) for f in frames]
+    merged = {}
+    for col in columns:
+        parts = [f[col] for f in frames]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            merged[col] = union_categoricals(parts, ignore_order=True)
+        else:
+            merged[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(merged)
+
+
+# -----------------------------------------------------------------------------
+# 파일 형식별 청크 읽기
+# -----------------------------------------------------------------------------
+def _iter_xlsx(path: str, chunk_rows: int):
+    from openpyxl import load_workbook
+    # Read-only mode streams rows instead of loading the whole sheet
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(c) for c in next(rows, ())]
+        while True:
+            batch = list(islice(rows, chunk_rows))
+            if not batch:
+                return
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def _iter_csv(path: str, chunk_rows: int):
+    # Everything as text first; apply_schema decides the final types
+    yield from pd.read_csv(path, chunksize=chunk_rows, dtype=str, keep_default_na=False,
+                           na_values=[''], encoding='utf-8-sig')
+
+
+def _iter_parquet(path: str, chunk_rows: int):
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+READERS = {
+    '.xlsx': _iter_xlsx,
+    '.csv': _iter_csv,
+    '.parquet': _iter_parquet,
+}
+
+
+def load_national(path: str = NATIONAL_DATASET, chunk_rows: int = CHUNK_ROWS,
+                  report: dict = None) -> pd.DataFrame:
+
+    # Chunks are typed as they arrive, so peak memory stays near the final
+    # frame plus one raw chunk rather than the whole sheet in object dtype
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f"지원하지 않는 형식입니다: {ext}")
+    frames = []
+    before = 0
+    for chunk in READERS[ext](path, chunk_rows):
+        before += memory_bytes(chunk)
+        frames.append(apply_schema(chunk))
+    df = concat_frames(frames) if frames else pd.DataFrame(columns=list(SCHEMA))
+    if report is not None:
+        report.update({
+            'rows': len(df),
+            'chunks': len(frames),
+            'bytes_before': before,
+            'bytes_after': memory_bytes(df),
+            'columns': {col: (str(df[col].dtype), int(df[col].memory_usage(deep=True, index=False)))
+                        for col in df.columns},
+        })
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전국 관광지/맛집 데이터를 스키마를 적용해 읽고 메모리 사용량을 보고합니다")
+    parser.add_argument('source', nargs='?', default=NATIONAL_DATASET, help="입력 파일 (.xlsx / .csv / .parquet)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--to-parquet', metavar='PATH', help="타입이 적용된 결과를 Parquet 으로 저장")
+    args = parser.parse_args()
+
+    report = {}
+    df = load_national(args.source, args.chunk_rows, report)
+    mib = 1024 * 1024
+    print(f"{report['rows']}행 ({report['chunks']}청크)")
+    print(f"메모리: 기본 타입 {report['bytes_before'] / mib:.2f} MiB -> 스키마 적용 {report['bytes_after'] / mib:.2f} MiB "
+          f"({report['bytes_after'] / max(report['bytes_before'], 1):.0%})")
+    for col, (dtype, nbytes) in report['columns'].items():
+        print(f"  {col:<12} {dtype:<16} {nbytes / 1024:>10.1f} KiB")
+    if args.to_parquet:
+        # Categoricals and Arrow strings round-trip, so later loads skip the conversion
+        df.to_parquet(args.to_parquet, index=False, compression='zstd')
+        print(f"저장 완료: {args.to_parquet}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import os
+import json
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from tour_core import google_key, kakao_key, google_get, search_kakao_restaurants, GOOGLE_API_BASE
+from api_usage import usage
+from national_data import NATIONAL_DATASET, REGIONS, load_national, apply_schema, concat_frames, manifest_path
+
+# -----------------------------------------------------------------------------
+# 전국 관광지/맛집 데이터 증분 갱신 (python national_refresh.py --budget 50)
+# -----------------------------------------------------------------------------
+# An attraction's restaurants are re-fetched after this many days regardless
+MAX_AGE_DAYS = 28
+# Kakao re-fetches allowed per run; the rest wait for the next run
+DEFAULT_BUDGET = 100
+CHANGE_LOG = "national_changes.jsonl"
+# Restaurant columns compared between runs (Kakao carries no ratings)
+RESTAURANT_FIELDS = ['맛집거리(m)', '맛집전화번호', '카카오맵 URL']
+
+
+def unit_key(region: str, name: str) -> str:
+    return f"{region}|{name}"
+
+
+def _fingerprint(*parts) -> str:
+    return hashlib.sha1('|'.join('' if p is None else str(p) for p in parts).encode('utf-8')).hexdigest()[:16]
+
+
+def _text(value) -> str:
+    return '' if value is None or pd.isna(value) else str(value)
+
+
+def _restaurant_key(row) -> tuple:
+    return (_text(row['맛집명']), _text(row['맛집주소']))
+
+
+def _rating(value):
+    # float32 in the typed frame vs float from JSON: compare at Google's precision
+    return None if value is None or pd.isna(value) else round(float(value), 1)
+
+
+# -----------------------------------------------------------------------------
+# 매니페스트 (관광지별 지문 / 수집 시각)
+# -----------------------------------------------------------------------------
+def load_manifest(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, path: str):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def seed_manifest(df: pd.DataFrame, fetched_at: str) -> dict:
+
+    # First incremental run over a notebook-built sheet: every attraction
+    # counts as fetched when the file was written
+    manifest = {}
+    for (region, name), rows in df.groupby(['지역', '관광지명'], sort=False, observed=True):
+        first = rows.iloc[0]
+        manifest[unit_key(region, name)] = {
+            'place': _fingerprint(name, _text(first['관광지주소'])),
+            'rating': _rating(first['관광지평점']),
+            'restaurants': _fingerprint(*sorted(map(_restaurant_key, rows.to_dict('records')))),
+            'fetched_at': fetched_at,
+        }
+    return manifest
+
+
+# -----------------------------------------------------------------------------
+# 변경 감지
+# -----------------------------------------------------------------------------
+def region_attractions(region: str) -> list:
+
+    # First page without the review filter, exactly as the crawl collected them
+    url = f"{GOOGLE_API_BASE}/maps/api/place/textsearch/json"
+    params = {'query': f"{region} 관광지", 'language': 'ko', 'key': google_key}
+    res = google_get('textsearch', url, params)
+    # None when the search was skipped or failed: the region is left untouched
+    if res is None or res.get('status') not in ('OK', 'ZERO_RESULTS'):
+        return None
+    return res.get('results', [])
+
+
+def restaurant_rows(region: str, place: dict, restaurants: list) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            '지역': region,
+            '관광지명': place.get('name'),
+            '관광지주소': place.get('formatted_address'),
+            '관광지평점': place.get('rating'),
+            '맛집명': r.get('place_name'),
+            '맛집주소': r.get('address_name'),
+            '맛집거리(m)': r.get('distance'),
+            '맛집전화번호': r.get('phone'),
+            '카카오맵 URL': r.get('place_url'),
+        }
+        for r in restaurants if r.get('place_name')
+    ])
+
+
+def diff_restaurants(unit: str, old: pd.DataFrame, new: pd.DataFrame) -> list:
+
+    # Restaurants are matched on (name, address); other fields are compared as text
+    fields = [c for c in RESTAURANT_FIELDS if c in old.columns and c in new.columns]
+    before = {_restaurant_key(r): r for r in old.to_dict('records')}
+    after = {_restaurant_key(r): r for r in new.to_dict('records')}
+    changes = []
+    for key in after.keys() - before.keys():
+        changes.append({'unit': unit, 'change': 'restaurant_added', 'restaurant': key[0], 'address': key[1]})
+    for key in before.keys() - after.keys():
+        changes.append({'unit': unit, 'change': 'restaurant_removed', 'restaurant': key[0], 'address': key[1]})
+    for key in before.keys() & after.keys():
+        diff = {f: [_text(before[key][f]), _text(after[key][f])]
+                for f in fields if _text(before[key][f]) != _text(after[key][f])}
+        if diff:
+            changes.append({'unit': unit, 'change': 'restaurant_changed', 'restaurant': key[0], 'fields': diff})
+    return changes
+
+
+def plan_refresh(manifest: dict, current: dict, now: datetime, max_age: timedelta, budget: int):
+
+    # current: unit -> (place fingerprint, rating). Returns (due, deferred, rerated);
+    # new attractions first, then moved ones, then the stalest
+    due = []
+    rerated = []
+    for unit, (place_fp, rating) in current.items():
+        entry = manifest.get(unit)
+        if entry is None:
+            due.append((0, '', unit))
+        elif entry['place'] != place_fp:
+            due.append((1, entry['fetched_at'], unit))
+        else:
+            if entry['rating'] != rating:
+                rerated.append(unit)
+            if now - datetime.fromisoformat(entry['fetched_at']) > max_age:
+                due.append((2, entry['fetched_at'], unit))
+    due.sort()
+    return [u for *_, u in due[:budget]], [u for *_, u in due[budget:]], rerated
+
+
+# -----------------------------------------------------------------------------
+# 갱신 실행
+# -----------------------------------------------------------------------------
+def refresh(dataset: str = NATIONAL_DATASET, budget: int = DEFAULT_BUDGET, max_age_days: int = MAX_AGE_DAYS,
+            prune: bool = False, change_log: str = CHANGE_LOG, dry_run: bool = False) -> dict:
+
+    now = datetime.now().replace(microsecond=0)
+    df = load_national(dataset) if os.path.exists(dataset) else pd.DataFrame()
+    mpath = manifest_path(dataset)
+    manifest = load_manifest(mpath)
+    if not manifest and not df.empty:
+        mtime = datetime.fromtimestamp(os.path.getmtime(dataset)).isoformat(timespec='seconds')
+        manifest = seed_manifest(df, mtime)
+
+    # 1) One Text Search per region tells which attractions exist and whether they moved or were re-rated
+    current, places, failed_regions = {}, {}, set()
+    for region in REGIONS:
+        found = region_attractions(region)
+        if found is None:
+            failed_regions.add(region)
+            continue
+        for place in found:
+            unit = unit_key(region, place.get('name'))
+            current[unit] = (_fingerprint(place.get('name'), place.get('formatted_address')),
+                             _rating(place.get('rating')))
+            places[unit] = (region, place)
+    due, deferred, rerated = plan_refresh(manifest, current, now, timedelta(days=max_age_days), budget)
+    # An attraction missing from a region whose search failed is unknown, not removed
+    removed = [u for u in manifest if u not in current and u.split('|', 1)[0] not in failed_regions] if prune else []
+
+    unit_of = (df['지역'].astype(str) + '|' + df['관광지명'].astype(str)) if not df.empty else pd.Series(dtype=str)
+    changes = []
+    # 2) Re-rated attractions are patched in place; only a move re-fetches restaurants
+    patched = df.copy()
+    for unit in rerated:
+        changes.append({'unit': unit, 'change': 'attraction_rerated',
+                        'rating': [manifest[unit]['rating'], current[unit][1]]})
+        manifest[unit]['rating'] = current[unit][1]
+        if not patched.empty:
+            patched.loc[unit_of == unit, '관광지평점'] = current[unit][1]
+    for unit in removed:
+        manifest.pop(unit)
+        changes.append({'unit': unit, 'change': 'attraction_removed'})
+
+    # 3) Kakao only for the units that are due
+    replaced, fresh, failed = set(), [], []
+    for unit in due:
+        region, place = places[unit]
+        location = place['geometry']['location']
+        found = search_kakao_restaurants(location['lat'], location['lng'], kakao_key)
+        if found is None:
+            # Keep the old rows and manifest entry; the unit stays due for the next run
+            failed.append(unit)
+            continue
+        new = restaurant_rows(region, place, found)
+        if not df.empty:
+            new = new.reindex(columns=df.columns)
+        old = df[unit_of == unit] if not df.empty else new.iloc[0:0]
+        if unit not in manifest:
+            changes.append({'unit': unit, 'change': 'attraction_added'})
+        changes.extend(diff_restaurants(unit, old, new))
+        manifest[unit] = {
+            'place': current[unit][0],
+            'rating': current[unit][1],
+            'restaurants': _fingerprint(*sorted(map(_restaurant_key, new.to_dict('records')))),
+            'fetched_at': now.isoformat(),
+        }
+        replaced.add(unit)
+        fresh.append(new)
+
+    drop = replaced | set(removed)
+    kept = patched[~unit_of.isin(drop)] if not patched.empty else patched
+    result = concat_frames([kept] + [apply_schema(f) for f in fresh]) if fresh else kept
+    summary = {
+        'run_at': now.isoformat(),
+        'attractions': len(current),
+        'refetched': len(replaced),
+        'failed': len(failed),
+        'failed_regions': len(failed_regions),
+        'deferred': len(deferred),
+        'rerated': len(rerated),
+        'removed': len(removed),
+        'rows': len(result),
+        'changes': len(changes),
+    }
+    if dry_run:
+        return summary
+    _write_dataset(result, dataset)
+    save_manifest(manifest, mpath)
+    with open(change_log, 'a', encoding='utf-8') as f:
+        for change in changes:
+            f.write(json.dumps(dict(change, run_at=summary['run_at']), ensure_ascii=False) + '\n')
+    return summary
+
+
+def _write_dataset(df: pd.DataFrame, path: str):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        df.to_parquet(path, index=False, compression='zstd')
+    elif ext == '.csv':
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+    else:
+        df.to_excel(path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전국 관광지/맛집 데이터에서 바뀌었거나 오래된 관광지만 다시 수집합니다")
+    parser.add_argument('dataset', nargs='?', default=NATIONAL_DATASET)
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET, help="이번 실행에서 다시 수집할 관광지 수 상한")
+    parser.add_argument('--max-age-days', type=int, default=MAX_AGE_DAYS)
+    parser.add_argument('--prune', action='store_true', help="검색 결과에서 사라진 관광지를 삭제")
+    parser.add_argument('--change-log', default=CHANGE_LOG)
+    parser.add_argument('--dry-run', action='store_true', help="파일을 쓰지 않고 계획만 출력")
+    args = parser.parse_args()
+    if not google_key or not kakao_key:
+        parser.error(".env 파일에 'Google_key' 와 'KAKAO_KEY' 가 필요합니다.")
+    # The per-session budget guards app visitors; this job is bounded by --budget
+    # (and the daily budget still applies)
+    usage.begin_rerun('national_refresh')
+    usage.session_budget = 0
+
+    s = refresh(args.dataset, args.budget, args.max_age_days, args.prune, args.change_log, args.dry_run)
+    print(f"관광지 {s['attractions']}곳: 재수집 {s['refetched']}, 다음 실행으로 미룸 {s['deferred']}, "
+          f"평점 변경 {s['rerated']}, 삭제 {s['removed']}")
+    if s['failed'] or s['failed_regions']:
+        print(f"호출 실패로 건너뜀: 관광지 {s['failed']}곳, 지역 {s['failed_regions']}곳 (다음 실행에서 다시 시도)")
+    print(f"API 호출: 텍스트 검색 {len(REGIONS)}회 + 카카오 {s['refetched'] + s['failed']}회 "
+          f"(전체 재수집 시 카카오 {s['attractions']}회)")
+    print(f"변경 {s['changes']}건 -> {args.change_log}, 데이터 {s['rows']}행 -> {args.dataset}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import os
+import json
+import gzip
+import time
+import base64
+import hashlib
+import tempfile
+from urllib.parse import urlparse, parse_qsl
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import env
+
+# -----------------------------------------------------------------------------
+# 외부 API 호출 계층 (live / record / replay)
+# -----------------------------------------------------------------------------
+# live: network only; record: network, and every response is saved;
+# replay: saved responses only, never the network
+MODE = env("PROVIDER_MODE", "live").lower()
+RECORD_DIR = env("PROVIDER_DIR", "recordings")
+# Never part of a fixture key or file
+SECRET_PARAMS = ('key',)
+# Connections kept open per host (search pages, hedged calls and photos run in parallel)
+POOL_SIZE = int(env("PROVIDER_POOL_SIZE", "16"))
+# Google only compresses responses for clients that say so in both headers
+DEFAULT_HEADERS = {'Accept-Encoding': 'gzip', 'User-Agent': 'MATtour/1.0 (gzip)'}
+
+if MODE not in ('live', 'record', 'replay'):
+    raise ValueError(f"PROVIDER_MODE must be live, record or replay (got {MODE!r})")
+
+
+class ReplayMiss(requests.RequestException):
+    """replay 모드에서 저장된 응답이 없는 요청"""
+
+
+class RecordedResponse:
+    """저장된 응답 (requests.Response 에서 쓰는 부분만)"""
+
+    __slots__ = ('status_code', 'content', 'headers', 'url')
+
+    def __init__(self, status_code: int, content: bytes, headers: dict, url: str):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _public_params(url: str, params: dict = None) -> dict:
+    # Photo URLs carry their parameters (and the key) in the query string
+    merged = dict(parse_qsl(urlparse(url).query))
+    merged.update(params or {})
+    return {k: str(v) for k, v in merged.items() if k not in SECRET_PARAMS}
+
+
+def fixture_path(endpoint: str, url: str, params: dict = None) -> str:
+
+    # Host-independent, so fixtures recorded against a mock upstream replay for the real one too
+    path = urlparse(url).path
+    public = sorted(_public_params(url, params).items())
+    digest = hashlib.sha1(json.dumps([path, public], ensure_ascii=False).encode('utf-8')).hexdigest()
+    return os.path.join(RECORD_DIR, endpoint, f"{digest}.json.gz")
+
+
+def _save(path: str, endpoint: str, url: str, params: dict, res):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    envelope = {
+        'endpoint': endpoint,
+        'path': urlparse(url).path,
+        'params': _public_params(url, params),
+        'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'status': res.status_code,
+        'content_type': res.headers.get('Content-Type', ''),
+        'body': base64.b64encode(res.content).decode('ascii'),
+    }
+    # A private temp file per writer: hedged duplicates of one request save concurrently
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+            json.dump(envelope, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _load(path: str, url: str) -> RecordedResponse:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        envelope = json.load(f)
+    return RecordedResponse(
+        envelope['status'],
+        base64.b64decode(envelope['body']),
+        {'Content-Type': envelope['content_type']},
+        url,
+    )
+
+
+_session = requests.Session()
+_session.headers.update(DEFAULT_HEADERS)
+_session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE))
+_session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE))
+
+
+def get(endpoint: str, url: str, params: dict = None, headers: dict = None, timeout: float = None):
+
+    # Drop-in for requests.get used by tour_core for every Google/Kakao call
+    if MODE == 'replay':
+        path = fixture_path(endpoint, url, params)
+        if not os.path.exists(path):
+            raise ReplayMiss(f"no recorded response for {endpoint} {_public_params(url, params)}")
+        return _load(path, url)
+    # One keep-alive session: no TLS handshake per call, gzip bodies on the wire
+    res = _session.get(url, params=params, headers=headers, timeout=timeout)
+    if MODE == 'record' and res.status_code == 200:
+        try:
+            _save(fixture_path(endpoint, url, params), endpoint, url, params, res)
+        except OSError:
+            # A fixture that couldn't be written must not cost the live response
+            pass
+    return res
+
+
+def pause(seconds: float):
+    # Rate-limit and page-token waits only matter against the real APIs
+    if MODE != 'replay':
+        time.sleep(seconds)
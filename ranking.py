@@ -0,0 +1,191 @@
+import os
+import copy
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+from national_data import NATIONAL_DATASET, load_national, concat_frames, manifest_path
+from config import env
+
+# -----------------------------------------------------------------------------
+# 인기도 가중 평점 (Bayesian average)
+# -----------------------------------------------------------------------------
+# A place needs about this many reviews before its own rating outweighs the
+# prior; matches the >= 50 review filter used when searching.
+PRIOR_COUNT = float(env("RANKING_PRIOR_COUNT", "50"))
+# Rows kept per region / per attraction in the precomputed tables
+TABLE_K = 10
+
+
+def weighted_score(ratings, counts, prior_mean: float = None, prior_count: float = PRIOR_COUNT) -> np.ndarray:
+
+    # score = (v * R + m * C) / (v + m); rows without a known count keep their raw rating
+    ratings = np.asarray(ratings, dtype=float)
+    counts = np.asarray(counts, dtype=float)
+    known = ~np.isnan(counts)
+    if prior_mean is None:
+        prior_mean = _prior_mean(ratings, counts)
+    v = np.where(known, counts, 0.0)
+    scores = (v * ratings + prior_count * prior_mean) / (v + prior_count)
+    return np.where(known, scores, ratings)
+
+
+def _prior_mean(ratings: np.ndarray, counts: np.ndarray) -> float:
+    valid = ~np.isnan(ratings)
+    if not valid.any():
+        return 0.0
+    weights = np.nan_to_num(counts[valid])
+    if weights.sum() > 0:
+        return float(np.average(ratings[valid], weights=weights))
+    return float(ratings[valid].mean())
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+
+    # Partial selection, then order only the k winners
+    if len(scores) <= k:
+        return np.argsort(-scores, kind='stable')
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+def add_scores(df: pd.DataFrame, rating_col: str = '평점', count_col: str = 'reviews_count',
+               prior_mean: float = None) -> pd.DataFrame:
+
+    # Adds a '점수' column and orders the frame by it, so Top-k is df.head(k)
+    ratings = pd.to_numeric(df[rating_col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    if count_col in df.columns:
+        counts = pd.to_numeric(df[count_col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    else:
+        counts = np.full(len(df), np.nan)
+    df = df.assign(점수=weighted_score(ratings, counts, prior_mean))
+    return df.sort_values('점수', ascending=False, kind='stable').reset_index(drop=True)
+
+
+# -----------------------------------------------------------------------------
+# 전국 데이터 지역/관광지별 Top-k 테이블
+# -----------------------------------------------------------------------------
+class RankingTables:
+    """지역별 관광지 Top-k, 관광지별 맛집 Top-k 를 미리 계산해 둔다"""
+
+    def __init__(self, df: pd.DataFrame, k: int = TABLE_K):
+        self.k = k
+        # One row per rated attraction, for lookups beyond the Top-k
+        self.attractions = self._attraction_rows(df)
+        # The prior stays fixed across incremental updates; a full reload refreshes it
+        self.prior_mean = _prior_mean(
+            self.attractions['관광지평점'].to_numpy(dtype=float, na_value=np.nan),
+            self.attractions['관광지리뷰수'].to_numpy(dtype=float, na_value=np.nan),
+        )
+        self.by_region = self._region_tables(self.attractions)
+        self.by_attraction = self._restaurant_tables(df)
+
+    # -- build ----------------------------------------------------------------
+    @staticmethod
+    def _attraction_rows(df: pd.DataFrame) -> pd.DataFrame:
+        cols = ['지역', '관광지명', '관광지주소', '관광지평점']
+        # The national sheets carry no review count; missing counts rank by raw rating
+        extra = ['관광지리뷰수'] if '관광지리뷰수' in df.columns else []
+        rows = df[cols + extra].drop_duplicates(subset=['지역', '관광지명'])
+        rows = rows.assign(관광지평점=pd.to_numeric(rows['관광지평점'], errors='coerce'))
+        if not extra:
+            rows = rows.assign(관광지리뷰수=np.nan)
+        return rows.dropna(subset=['관광지평점'])
+
+    def _region_tables(self, attractions: pd.DataFrame) -> dict:
+        scored = attractions.assign(점수=weighted_score(
+            attractions['관광지평점'].to_numpy(dtype=float, na_value=np.nan),
+            attractions['관광지리뷰수'].to_numpy(dtype=float, na_value=np.nan),
+            self.prior_mean,
+        ))
+        top = (scored.sort_values(['지역', '점수'], ascending=[True, False], kind='stable')
+               .groupby('지역', sort=False, observed=True).head(self.k))
+        return {region: g.reset_index(drop=True) for region, g in top.groupby('지역', sort=False, observed=True)}
+
+    def _restaurant_tables(self, df: pd.DataFrame) -> dict:
+        rows = df.dropna(subset=['맛집명'])
+        if '맛집평점' in rows.columns:
+            rows = rows.assign(점수=weighted_score(
+                pd.to_numeric(rows['맛집평점'], errors='coerce').to_numpy(dtype=float, na_value=np.nan),
+                pd.to_numeric(rows['맛집리뷰수'], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+                if '맛집리뷰수' in rows.columns else np.full(len(rows), np.nan),
+            ))
+        else:
+            # Without restaurant ratings the closest places come first
+            distance = pd.to_numeric(rows['맛집거리(m)'], errors='coerce')
+            rows = rows.assign(점수=-distance.to_numpy(dtype=float, na_value=np.nan))
+        top = (rows.sort_values(['관광지명', '점수'], ascending=[True, False], kind='stable')
+               .groupby(['지역', '관광지명'], sort=False, observed=True).head(self.k))
+        groups = top.groupby(['지역', '관광지명'], sort=False, observed=True)
+        return {key: g.reset_index(drop=True) for key, g in groups}
+
+    # -- lookup ---------------------------------------------------------------
+    def top_attractions(self, region: str, k: int = 5) -> pd.DataFrame:
+        table = self.by_region.get(region)
+        return table.head(k) if table is not None else pd.DataFrame()
+
+    def region_attractions(self, region: str) -> pd.DataFrame:
+        return self.attractions[self.attractions['지역'] == region]
+
+    def top_restaurants(self, region: str, attraction: str, k: int = 5) -> pd.DataFrame:
+        table = self.by_attraction.get((region, attraction))
+        return table.head(k) if table is not None else pd.DataFrame()
+
+    # -- refresh --------------------------------------------------------------
+    def updated(self, df: pd.DataFrame, units: set) -> 'RankingTables':
+
+        # A copy with only the changed attractions and their regions recomputed
+        # from df (the whole new dataset); units are (지역, 관광지명) pairs.
+        # Readers of the old tables are never disturbed.
+        tables = copy.copy(self)
+        regions = {region for region, _ in units}
+        region_rows = self._attraction_rows(df[df['지역'].astype(str).isin(regions)])
+        kept = self.attractions[~self.attractions['지역'].astype(str).isin(regions)]
+        tables.attractions = concat_frames([kept, region_rows])
+        tables.by_region = {r: t for r, t in self.by_region.items() if r not in regions}
+        tables.by_region.update(self._region_tables(region_rows))
+        keys = pd.MultiIndex.from_arrays([df['지역'].astype(str), df['관광지명'].astype(str)])
+        tables.by_attraction = {key: t for key, t in self.by_attraction.items() if key not in units}
+        tables.by_attraction.update(self._restaurant_tables(df[keys.isin(list(units))]))
+        return tables
+
+
+def _read_manifest(path: str, mtime: float):
+    # None unless the manifest was written with (after) this version of the dataset
+    mpath = manifest_path(path)
+    if not os.path.exists(mpath) or os.path.getmtime(mpath) < mtime:
+        return None
+    with open(mpath, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def changed_units(old: dict, new: dict) -> set:
+    # Manifest entries are "지역|관광지명" -> fingerprints/rating/fetch time
+    return {tuple(unit.split('|', 1)) for unit in old.keys() | new.keys() if old.get(unit) != new.get(unit)}
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def load_national_rankings(path: str = NATIONAL_DATASET) -> RankingTables:
+
+    # Reloaded when national_refresh.py rewrites the file. When its manifest
+    # says which attractions changed, only those and their regions are
+    # recomputed; without one the tables are rebuilt.
+    mtime = os.path.getmtime(path)
+    with _loaded_lock:
+        previous = _loaded.get(path)
+    if previous is not None and previous[0] == mtime:
+        return previous[2]
+    df = load_national(path)
+    manifest = _read_manifest(path, mtime)
+    if previous is not None and previous[1] is not None and manifest is not None:
+        tables = previous[2].updated(df, changed_units(previous[1], manifest))
+    else:
+        tables = RankingTables(df)
+    with _loaded_lock:
+        _loaded[path] = (mtime, manifest, tables)
+    return tables
@@ -0,0 +1,214 @@
+import sys
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+import address
+import ranking
+from api_usage import usage
+
+# -----------------------------------------------------------------------------
+# 관광지 레코드 (화면에 쓰는 필드만 보관)
+# -----------------------------------------------------------------------------
+# How long a session may sit idle before its search results are dropped
+SESSION_IDLE_TTL = 30 * 60
+# Idle sessions are looked for at most this often
+SWEEP_INTERVAL = 60
+
+
+class PlaceRecord:
+    """Places 검색 결과 한 건의 축약본"""
+
+    # Everything else in the Places JSON (html_attributions, plus_code,
+    # opening_hours, extra photos...) is dropped; reviews and photos are
+    # fetched on demand by place_id / photo_ref
+    __slots__ = ('place_id', 'name', 'address', 'rating', 'ratings_total',
+                 'lat', 'lng', 'photo_ref', 'line1', 'line2')
+
+    def __init__(self, place_id, name, address, rating, ratings_total, lat, lng, photo_ref, line1, line2):
+        self.place_id = place_id
+        self.name = name
+        self.address = address
+        self.rating = rating
+        self.ratings_total = ratings_total
+        self.lat = lat
+        self.lng = lng
+        self.photo_ref = photo_ref
+        self.line1 = line1
+        self.line2 = line2
+
+    def as_row(self) -> tuple:
+        # Plain tuple for the shared cache (msgpack/JSON can't carry the class)
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def as_dict(self) -> dict:
+        return {
+            'place_id': self.place_id,
+            'name': self.name,
+            'address': self.address,
+            'rating': self.rating,
+            'user_ratings_total': self.ratings_total,
+            'lat': self.lat,
+            'lng': self.lng,
+            'photo_reference': self.photo_ref,
+        }
+
+
+def place_row(place: dict) -> tuple:
+
+    # Places JSON straight to the PlaceRecord slot tuple (google_get projections)
+    location = (place.get('geometry') or {}).get('location') or {}
+    photos = place.get('photos') or []
+    full_address = place.get('formatted_address') or place.get('vicinity') or ''
+    # Parse the address once on arrival; only the two card lines are kept
+    parts = address.parse(full_address)
+    return (
+        sys.intern(place['place_id']) if place.get('place_id') else None,
+        place.get('name', ''),
+        full_address,
+        place.get('rating'),
+        place.get('user_ratings_total', 0),
+        location.get('lat'),
+        location.get('lng'),
+        photos[0].get('photo_reference') if photos else None,
+        parts['주소1'],
+        parts['주소2'],
+    )
+
+
+def from_rows(rows: list) -> list:
+    return [PlaceRecord(*row) for row in rows]
+
+
+def _number(value):
+    return None if value is None or pd.isna(value) else value
+
+
+def from_sheet(attractions: pd.DataFrame) -> list:
+
+    # National-sheet attractions: no place_id or photo, and coordinates only
+    # once geocode_batch.py has filled 위도/경도
+    result = []
+    for row in attractions.to_dict('records'):
+        full_address = '' if _number(row.get('관광지주소')) is None else str(row['관광지주소'])
+        parts = address.parse(full_address)
+        rating, count = _number(row.get('관광지평점')), _number(row.get('관광지리뷰수'))
+        lat, lng = _number(row.get('위도')), _number(row.get('경도'))
+        result.append(PlaceRecord(
+            None, str(row['관광지명']), full_address,
+            None if rating is None else float(rating),
+            None if count is None else int(count),
+            None if lat is None else float(lat),
+            None if lng is None else float(lng),
+            None, parts['주소1'], parts['주소2'],
+        ))
+    return result
+
+
+def rank_records(records: list, k: int = 5) -> list:
+
+    # Popularity-weighted rating (ranking.weighted_score), read off the slots
+    rated = [r for r in records if isinstance(r.rating, (int, float))]
+    if not rated:
+        return []
+    ratings = np.fromiter((r.rating for r in rated), dtype=float, count=len(rated))
+    # Sheet records have no count (None -> NaN): those keep their raw rating
+    counts = np.fromiter((np.nan if r.ratings_total is None else r.ratings_total for r in rated),
+                         dtype=float, count=len(rated))
+    order = ranking.top_k_indices(ranking.weighted_score(ratings, counts), k)
+    return [rated[i] for i in order]
+
+
+# -----------------------------------------------------------------------------
+# 세션별 상태 보관 / 메모리 집계
+# -----------------------------------------------------------------------------
+def deep_sizeof(obj, seen: set = None) -> int:
+
+    # Approximate retained bytes; shared objects are counted once per call
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return size + sum(deep_sizeof(item, seen) for item in obj)
+    for name in getattr(type(obj), '__slots__', ()):
+        size += deep_sizeof(getattr(obj, name, None), seen)
+    if hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen)
+    return size
+
+
+class SessionStore:
+    """세션별 무거운 상태 (검색 결과 등) 보관소, 오래 쉬는 세션은 비운다"""
+
+    def __init__(self, idle_ttl: float = SESSION_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        self._data = {}
+        self._seen = {}
+        self._last_sweep = time.monotonic()
+        self.evicted = 0
+
+    def touch(self, session_id: str) -> dict:
+
+        # Called once per rerun: marks the session active and returns its state
+        now = time.monotonic()
+        with self._lock:
+            self._seen[session_id] = now
+            state = self._data.setdefault(session_id, {})
+            due = now - self._last_sweep >= SWEEP_INTERVAL
+        if due:
+            self.sweep(now)
+        return state
+
+    def sweep(self, now: float = None) -> int:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            idle = [sid for sid, seen in self._seen.items() if now - seen > self.idle_ttl]
+            for sid in idle:
+                self._data.pop(sid, None)
+                self._seen.pop(sid, None)
+            self.evicted += len(idle)
+        # Usage counters leave with the session they belong to
+        for sid in idle:
+            usage.end_session(sid)
+        return len(idle)
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._data.pop(session_id, None)
+            self._seen.pop(session_id, None)
+        usage.end_session(session_id)
+
+    def sizes(self) -> list:
+
+        # One row per live session, largest first
+        now = time.monotonic()
+        with self._lock:
+            live = [(sid, dict(state), self._seen.get(sid, now)) for sid, state in self._data.items()]
+        rows = [
+            {
+                'session': sid,
+                'bytes': deep_sizeof(state),
+                'idle_s': round(now - seen, 1),
+                'keys': ', '.join(sorted(state)),
+            }
+            for sid, state, seen in live
+        ]
+        return sorted(rows, key=lambda r: r['bytes'], reverse=True)
+
+
+sessions = SessionStore()
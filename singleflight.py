@@ -0,0 +1,57 @@
+import threading
+
+# -----------------------------------------------------------------------------
+# 동일 요청 병합 (singleflight)
+# -----------------------------------------------------------------------------
+class _Call:
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class Group:
+    """같은 키의 동시 호출을 하나의 실제 호출로 합친다"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, timeout: float = None):
+
+        # Returns (result, shared); shared is True for callers that waited on
+        # another thread's request instead of making their own. A waiter that
+        # gives up after timeout seconds gets (None, True).
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+        if not leader:
+            if not call.done.wait(timeout):
+                return None, True
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the key before waking waiters so later callers start fresh
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -2,424 +2,485 @@ import streamlit as st
 import pandas as pd
 import requests
 import time
-import os
-import re
-import io
 import textwrap
-from PIL import Image
-import streamlit.components.v1 as components
-from dotenv import load_dotenv
 import base64
-
-# Load environment variables
-load_dotenv()
-google_key = os.getenv("Google_key")
-kakao_key = os.getenv("KAKAO_KEY")
+import contextvars
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from api_usage import usage, hit_ratio
+from tracing import span, traced
+import deadline
+from cache_backend import cache, make_key
+import image_pipeline
+import card_templates
+import exporter
+import itinerary
+from records import sessions, rank_records
+from config import env
+import autocomplete
+import density_tiles
+import kakao_map
+from tour_core import (
+    google_key, kakao_key, google_get, get_lat_lng, get_place_photo_url,
+    get_latest_review, load_restaurants, start_search,
+)
 
 # -----------------------------------------------------------------------------
-# 데이터 전처리 함수
+# 추천 카드 공통 함수 (스켈레톤 → 사진/리뷰 순차 반영)
 # -----------------------------------------------------------------------------
-def preprocess_restaurant_data(df: pd.DataFrame) -> pd.DataFrame:
- 
-    # Strip whitespace and remove placeholder names
-    df['이름'] = df['이름'].astype(str).str.strip()
-    df = df[~df['이름'].isin(['-', '없음', '', None])]
-    # Remove duplicates based on the restaurant name
-    df = df.drop_duplicates(subset='이름')
-    # Convert ratings to numeric and drop rows without a rating
-    df['평점'] = pd.to_numeric(df['평점'], errors='coerce')
-    df = df.dropna(subset=['평점'])
-    # Normalise the address
-    df['주소'] = df['주소'].astype(str).str.strip()
-    df['주소'] = df['주소'].str.replace(r'^KR, ?', '', regex=True)
-    df['주소'] = df['주소'].str.replace(r'^South Korea,?\s*', '', regex=True)
-    df['주소'] = df['주소'].str.rstrip('/')
-    # Filter out addresses that are just english letters/numbers/punctuation
-    df = df[~df['주소'].apply(lambda x: bool(re.fullmatch(r'[A-Za-z0-9 ,.-]+', x)))]
-    df = df[df['주소'].str.strip() != '']
-    df = df.dropna(subset=['주소'])
-    # Sort by rating descending
-    df = df.sort_values(by='평점', ascending=False)
-    return df.reset_index(drop=True)
-
-
-def get_lat_lng(address: str, api_key: str):
-
-    url = "https://maps.googleapis.com/maps/api/geocode/json"
-    params = {'address': address, 'language': 'ko', 'key': api_key}
-    res = requests.get(url, params=params).json()
-    if res.get('status') == 'OK' and res['results']:
-        location = res['results'][0]['geometry']['location']
-        return location['lat'], location['lng']
-    return None, None
-
-
-def find_nearby_restaurants(lat: float, lng: float, api_key: str, radius: int = 3000):
- 
-    url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    params = {
-        'location': f'{lat},{lng}',
-        'radius': radius,
-        'type': 'restaurant',
-        'language': 'ko',
-        'key': api_key
-    }
-    res = requests.get(url, params=params).json()
-    # Delay to avoid hitting rate limits
-    time.sleep(1)
-    results = res.get('results', [])
-    # Filter out restaurants with fewer than 50 reviews
-    results = [r for r in results if r.get('user_ratings_total', 0) >= 50]
-    # Limit to the top 15 results to control API usage
-    results = results[:15]
-    restaurants = []
-    for r in results:
-        restaurants.append({
-            '이름': r.get('name'),
-            '주소': r.get('vicinity'),
-            '평점': r.get('rating', '없음'),
-            '위도': r['geometry']['location']['lat'],
-            '경도': r['geometry']['location']['lng'],
-            # Preserve photos and place_id for further use (e.g., images and reviews)
-            'photos': r.get('photos'),
-            'place_id': r.get('place_id'),
-            # Also store number of reviews for potential future use
-            'reviews_count': r.get('user_ratings_total', 0)
-        })
-    return restaurants
+# Photo and review lookups for a Top-5 row run side by side off the script thread
+_asset_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='card-assets')
+# Photos are kept as right-sized WebP for a day; the reference itself is stable
+PHOTO_TTL = 24 * 3600
+# Assets finishing within this window are painted in the same row update
+ROW_UPDATE_INTERVAL = 0.1
 
 
-def search_places(query: str, api_key: str):
+def place_link_for(name: str, place_id) -> str:
 
-    url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    params = {'query': f"{query} 관광지", 'language': 'ko', 'key': api_key}
-    res = requests.get(url, params=params).json()
-    results = res.get('results', [])
-    # Filter places with at least 50 user ratings
-    filtered = [p for p in results if p.get('user_ratings_total', 0) >= 50]
-    return filtered
+    # Construct Google Maps link. Prefer place_id for accuracy.
+    if place_id:
+        return f"https://www.google.com/maps/place/?q=place_id:{place_id}"
+    query_name = requests.utils.quote(name)
+    return f"https://www.google.com/maps/search/?api=1&query={query_name}"
 
 
-def get_place_photo_url(photo_reference: str, api_key: str, maxwidth: int = 400) -> str:
+def fetch_card_image(photo_reference: str):
 
-    return (
-        f"https://maps.googleapis.com/maps/api/place/photo?maxwidth={maxwidth}"
-        f"&photoreference={photo_reference}&key={api_key}"
-    )
+    # Request the smallest adequate width and keep only the transcoded result
+    width = image_pipeline.photo_request_width()
+    key = make_key('card_image', photo_reference, width, image_pipeline.CARD_CSS_WIDTH)
+    image = cache.get(key)
+    if image is not None:
+        usage.record('photo', cache_hit=True)
+        return image
+    url = get_place_photo_url(photo_reference, google_key, maxwidth=width)
+    with span('photo_download', width=width):
+        content = google_get('photo', url, as_json=False, store=False)
+    if not content:
+        return None
+    with span('photo_transcode', bytes_in=len(content)):
+        try:
+            webp, placeholder = image_pipeline.transcode(content)
+            image = {'src': image_pipeline.publish(webp), 'placeholder': placeholder}
+        except Exception:
+            # Pillow missing or unreadable image: serve the original bytes
+            encoded = base64.b64encode(content).decode()
+            image = {'src': f"data:image/jpeg;base64,{encoded}", 'placeholder': ''}
+    cache.set(key, image, ttl=PHOTO_TTL)
+    return image
 
 
-def get_latest_review(place_id: str, api_key: str, language: str = 'ko'):
-  
-    details_url = "https://maps.googleapis.com/maps/api/place/details/json"
-    params = {
-        'place_id': place_id,
-        'fields': 'review',
-        'language': language,
-        'key': api_key
-    }
+def fetch_photo(photo_reference: str):
+
     try:
-        res = requests.get(details_url, params=params).json()
-        reviews = res.get('result', {}).get('reviews', [])
-        if not reviews:
-            return None
-        # Sort reviews by timestamp descending to get the most recent
-        latest = max(reviews, key=lambda x: x.get('time', 0))
-        return latest
+        image = fetch_card_image(photo_reference)
+        if image or usage.degraded():
+            return image
     except Exception:
+        pass
+    # Fallback to serving via Google if direct fetch fails
+    url = get_place_photo_url(photo_reference, google_key, maxwidth=image_pipeline.photo_request_width())
+    return {'src': url, 'placeholder': ''}
+
+
+def fetch_review(place_id: str):
+
+    latest_review = get_latest_review(place_id, google_key)
+    if not latest_review:
         return None
+    return {
+        'text': textwrap.shorten(latest_review.get('text', ''), width=70, placeholder='…'),
+        'author': latest_review.get('author_name', ''),
+    }
+
+
+def render_cards(cards: list, variant: str):
 
+    # Paint the whole row right away with skeletons where the photo/review will go
+    for card in cards:
+        card['image'] = card_templates.PENDING if card['photo_ref'] else None
+        card['review'] = card_templates.PENDING if card['place_id'] else None
+    slot = st.empty()
+    with span('render_row', variant=variant):
+        slot.markdown(card_templates.render_row(cards, variant), unsafe_allow_html=True)
 
-def display_top_attractions(places: list):
+    # Fill cards in as assets resolve; the row is re-sent as a single delta.
+    # Photos get the whole card budget, reviews only the first part of it; the
+    # copied contexts carry those deadlines into the upstream calls
+    futures = {}
+    with deadline.scope(deadline.CARD_ASSET_BUDGET) as until:
+        for idx, card in enumerate(cards):
+            if card['photo_ref']:
+                future = _asset_pool.submit(contextvars.copy_context().run, fetch_photo, card['photo_ref'])
+                futures[future] = (idx, 'image')
+        with deadline.scope(deadline.CARD_ASSET_BUDGET * deadline.REVIEW_SHARE):
+            for idx, card in enumerate(cards):
+                if card['place_id']:
+                    future = _asset_pool.submit(contextvars.copy_context().run, fetch_review, card['place_id'])
+                    futures[future] = (idx, 'review')
+    pending = set(futures)
+    while pending:
+        left = until - time.monotonic()
+        if left <= 0:
+            break
+        done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        time.sleep(min(ROW_UPDATE_INTERVAL, max(0.0, until - time.monotonic())) if pending else 0)
+        done |= {f for f in pending if f.done()}
+        pending -= done
+        for future in done:
+            idx, field = futures[future]
+            try:
+                cards[idx][field] = future.result()
+            except Exception:
+                cards[idx][field] = None
+        with span('render_row', variant=variant):
+            slot.markdown(card_templates.render_row(cards, variant), unsafe_allow_html=True)
+    if pending:
+        # Out of time: drop the stragglers from this render. Their requests are
+        # already bounded by the deadline, and anything that still lands is
+        # cached for the next rerun
+        for future in pending:
+            idx, field = futures[future]
+            cards[idx][field] = None
+        with span('render_row', variant=variant, skipped=len(pending)):
+            slot.markdown(card_templates.render_row(cards, variant), unsafe_allow_html=True)
+
+
+@traced('render_attractions')
+def display_top_attractions(top_five: list):
    
-    # Filter out places without numeric ratings and sort descending
-    rated_places = [p for p in places if isinstance(p.get('rating'), (int, float))]
-    rated_places = sorted(rated_places, key=lambda p: p['rating'], reverse=True)
-    top_five = rated_places[:5]
+    # top_five is already ranked by popularity-weighted rating (PagedSearch.top)
     if not top_five:
         return
     st.markdown("#### ⭐ 추천 관광지 Top 5")
-    cols = st.columns(len(top_five))
-    for idx, place in enumerate(top_five):
-        with cols[idx]:
-            name = place.get('name', '')
-            rating = place.get('rating', '없음')
-            img_html = ''
-            photos = place.get('photos')
-            if photos:
-                ref = photos[0].get('photo_reference')
-                if ref:
-                    url = get_place_photo_url(ref, google_key)
-                    try:
-                        resp = requests.get(url)
-                        if resp.status_code == 200:
-                            encoded = base64.b64encode(resp.content).decode()
-                            # 고정 높이와 확대 효과를 적용한 이미지
-                            img_html = (
-                                f"<img src='data:image/jpeg;base64,{encoded}' "
-                                "style='width:100%; height:150px; object-fit:cover; border-radius:8px; margin-top:5px; transition: transform 0.3s ease;' "
-                                "onmouseover=\"this.style.transform='scale(1.05)'\" "
-                                "onmouseout=\"this.style.transform='scale(1.0)'\"/>"
-                            )
-                        else:
-                            # Fallback to serving via Google if direct fetch fails
-                            img_html = (
-                                f"<img src='{url}' "
-                                "style='width:100%; height:150px; object-fit:cover; border-radius:8px; margin-top:5px; transition: transform 0.3s ease;' "
-                                "onmouseover=\"this.style.transform='scale(1.05)'\" "
-                                "onmouseout=\"this.style.transform='scale(1.0)'\"/>"
-                            )
-                    except Exception:
-                        img_html = (
-                            f"<img src='{url}' "
-                            "style='width:100%; height:150px; object-fit:cover; border-radius:8px; margin-top:5px; transition: transform 0.3s ease;' "
-                            "onmouseover=\"this.style.transform='scale(1.05)'\" "
-                            "onmouseout=\"this.style.transform='scale(1.0)'\"/>"
-                        )
-            # Split address into two lines for neat display
-            raw_address = place.get('formatted_address') or place.get('vicinity') or ''
-            if '시' in raw_address:
-                idx_si = raw_address.find('시')
-                line1 = raw_address[:idx_si + 1]
-                line2 = raw_address[idx_si + 1:].strip()
-            elif '도' in raw_address:
-                idx_do = raw_address.find('도')
-                line1 = raw_address[:idx_do + 1]
-                line2 = raw_address[idx_do + 1:].strip()
-            else:
-                parts = raw_address.split(' ', 1)
-                line1 = parts[0] if parts else raw_address
-                line2 = parts[1] if len(parts) > 1 else ''
-            # Truncate lines to prevent overflow
-            line1 = textwrap.shorten(line1, width=25, placeholder='…')
-            line2 = textwrap.shorten(line2, width=25, placeholder='…')
-
-            # Construct Google Maps link. Prefer place_id for accuracy.
-            place_id = place.get('place_id')
-            if place_id:
-                place_link = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-            else:
-                query_name = requests.utils.quote(name)
-                place_link = f"https://www.google.com/maps/search/?api=1&query={query_name}"
-
-            # Fetch the latest review if available
-            latest_review = None
-            if place_id:
-                latest_review = get_latest_review(place_id, google_key)
-            if latest_review:
-                review_text = latest_review.get('text', '')
-                author_name = latest_review.get('author_name', '')
-                review_snippet = textwrap.shorten(review_text, width=70, placeholder='…')
-                review_html = (
-                    f"<div style='margin-top:8px; height:auto; font-size:12px; line-height:1.4; color:#444444; text-align:center;'>“{review_snippet}”"
-                    f"<br><span style='font-size:11px; color:#888888;'>- {author_name}</span></div>"
-                )
-            else:
-                review_html = ''
-
-            # Card HTML with fixed heights to align the review start position
-            card_html = (
-                "<div style=\"background-color:#F7F7F7; "
-                "border-radius:15px; padding:16px; margin-top:10px; "
-                "height:400px; display:flex; flex-direction:column; justify-content:flex-start; "
-                "box-shadow:0 4px 8px rgba(0,0,0,0.1);\">"
-                "<div style='display:flex; align-items:center; justify-content:space-between; min-height:36px;'>"
-                f"<span style='font-weight:bold; font-size:18px; color:#000000; flex-grow:1; text-align:center;'>{name}</span>"
-                f"<a href='{place_link}' target='_blank' style='font-size:14px; color:#999999; text-decoration:none; margin-left:4px;' "
-                "onmouseover=\"this.style.color='#005FCC'\" onmouseout=\"this.style.color='#999999'\">🔗</a>"
-                "</div>"
-                f"{img_html}"
-                f"<div style='margin-top:8px; min-height:28px; font-size:14px; color:#F39C12; text-align:center;'>⭐ {rating}</div>"
-                f"<div style='margin-top:8px; min-height:44px; font-size:12px; line-height:1.4; color:#666666; text-align:center;'>{line1}<br>{line2}</div>"
-                f"{review_html}"
-                "</div>"
-            )
-            st.markdown(card_html, unsafe_allow_html=True)
+    cards = []
+    for place in top_five:
+        cards.append({
+            'name': place.name,
+            'rating': place.rating if place.rating is not None else '없음',
+            'line1': place.line1,
+            'line2': place.line2,
+            'link': place_link_for(place.name, place.place_id),
+            'place_id': place.place_id,
+            'photo_ref': place.photo_ref,
+        })
+    render_cards(cards, 'attraction')
 
 # -----------------------------------------------------------------------------
 # 맛집 추천 카드 표시 함수
 # -----------------------------------------------------------------------------
+@traced('render_restaurants')
 def display_top_restaurants(restaurants: pd.DataFrame):
  
-    df = restaurants.copy()
-    df['평점'] = pd.to_numeric(df['평점'], errors='coerce')
-    df = df.dropna(subset=['평점'])
+    # load_restaurants() already ordered the table by weighted score
+    df = restaurants.head(5)
     if df.empty:
         return
-    df = df.sort_values(by='평점', ascending=False).head(5)
     st.markdown("#### 🍽 추천 맛집 Top 5")
-    cols = st.columns(len(df))
-    for idx, row in df.reset_index(drop=True).iterrows():
-        with cols[idx]:
-            name = row['이름']
-            rating = row['평점']
-            img_html = ''
-            photos = row.get('photos', None)
-            if photos:
-                ref = photos[0].get('photo_reference') if isinstance(photos, list) and photos else None
-                if ref:
-                    url = get_place_photo_url(ref, google_key)
-                    try:
-                        resp = requests.get(url)
-                        if resp.status_code == 200:
-                            encoded = base64.b64encode(resp.content).decode()
-                            img_html = (
-                                f"<img src='data:image/jpeg;base64,{encoded}' "
-                                "style='width:100%; height:150px; object-fit:cover; border-radius:8px; margin-top:5px; transition: transform 0.3s ease;' "
-                                "onmouseover=\"this.style.transform='scale(1.05)'\" "
-                                "onmouseout=\"this.style.transform='scale(1.0)'\"/>"
-                            )
-                        else:
-                            img_html = (
-                                f"<img src='{url}' "
-                                "style='width:100%; height:150px; object-fit:cover; border-radius:8px; margin-top:5px; transition: transform 0.3s ease;' "
-                                "onmouseover=\"this.style.transform='scale(1.05)'\" "
-                                "onmouseout=\"this.style.transform='scale(1.0)'\"/>"
-                            )
-                    except Exception:
-                        img_html = (
-                            f"<img src='{url}' "
-                            "style='width:100%; height:150px; object-fit:cover; border-radius:8px; margin-top:5px; transition: transform 0.3s ease;' "
-                            "onmouseover=\"this.style.transform='scale(1.05)'\" "
-                            "onmouseout=\"this.style.transform='scale(1.0)'\"/>"
-                        )
-            raw_address = row['주소'] or ''
-            if '시' in raw_address:
-                idx_si = raw_address.find('시')
-                line1 = raw_address[:idx_si + 1]
-                line2 = raw_address[idx_si + 1:].strip()
-            elif '도' in raw_address:
-                idx_do = raw_address.find('도')
-                line1 = raw_address[:idx_do + 1]
-                line2 = raw_address[idx_do + 1:].strip()
-            else:
-                parts = raw_address.split(' ', 1)
-                line1 = parts[0] if parts else raw_address
-                line2 = parts[1] if len(parts) > 1 else ''
-            line1 = textwrap.shorten(str(line1), width=25, placeholder='…')
-            line2 = textwrap.shorten(str(line2), width=25, placeholder='…')
-            place_id = row.get('place_id')
-            if place_id:
-                place_link = f"https://www.google.com/maps/place/?q=place_id:{place_id}"
-            else:
-                query_name = requests.utils.quote(name)
-                place_link = f"https://www.google.com/maps/search/?api=1&query={query_name}"
-            latest_review = None
-            if place_id:
-                latest_review = get_latest_review(place_id, google_key)
-            if latest_review:
-                review_text = latest_review.get('text', '')
-                author_name = latest_review.get('author_name', '')
-                review_snippet = textwrap.shorten(review_text, width=70, placeholder='…')
-                review_html = (
-                    f"<div style='margin-top:8px; height:auto; font-size:12px; line-height:1.4; color:#444444; text-align:center;'>“{review_snippet}”"
-                    f"<br><span style='font-size:11px; color:#888888;'>- {author_name}</span></div>"
-                )
-            else:
-                review_html = ''
-            card_html = (
-                "<div style=\"background-color:#F7F7F7; "
-                "border-radius:15px; padding:16px; margin-top:10px; "
-                "height:410px; display:flex; flex-direction:column; justify-content:flex-start; "
-                "box-shadow:0 4px 8px rgba(0,0,0,0.1);\">"
-                "<div style='display:flex; align-items:center; justify-content:space-between; height:48px; overflow:hidden; margin-bottom:5px;'>"
-                f"<span style='font-weight:bold; font-size:18px; color:#000000; flex-grow:1; text-align:center;'>{name}</span>"
-                f"<a href='{place_link}' target='_blank' style='font-size:14px; color:#999999; text-decoration:none; margin-left:4px;' "
-                "onmouseover=\"this.style.color='#005FCC'\" onmouseout=\"this.style.color='#999999'\">🔗</a>"
-                "</div>"
-                f"{img_html}"
-                f"<div style='margin-top:8px; min-height:28px; font-size:14px; color:#F39C12; text-align:center;'>⭐ {rating}</div>"
-                f"<div style='margin-top:8px; min-height:44px; font-size:12px; line-height:1.4; color:#666666; text-align:center;'>{line1}<br>{line2}</div>"
-                f"{review_html}"
-                "</div>"
-            )
-            st.markdown(card_html, unsafe_allow_html=True)
+    cards = []
+    for _, row in df.iterrows():
+        name = row['이름']
+        cards.append({
+            'name': name,
+            'rating': row['평점'],
+            'line1': row['주소1'],
+            'line2': row['주소2'],
+            'link': place_link_for(name, row.get('place_id')),
+            'place_id': row.get('place_id'),
+            'photo_ref': row.get('photo_ref'),
+        })
+    render_cards(cards, 'restaurant')
+
+# -----------------------------------------------------------------------------
+# 카카오맵 표시 함수
+# -----------------------------------------------------------------------------
+# Map level 4 is about Leaflet zoom 15: the finest (~150 m) density tiles
+DENSITY_ZOOM = 15
+DENSITY_RADIUS_KM = 3
+DENSITY_CIRCLE_M = 80
+
+
+def render_kakao_map(df: pd.DataFrame, lat: float, lng: float):
+
+    # One persistent map: changing attraction only moves the view and swaps markers
+    circles = [
+        kakao_map.circle(p[0], p[1], DENSITY_CIRCLE_M, 0.1 + 0.4 * p[2])
+        for p in density_tiles.heat_points(DENSITY_ZOOM, density_tiles.around(lat, lng, DENSITY_RADIUS_KM))
+    ]
+    markers = [
+        kakao_map.marker(_restaurant_id(row), row['위도'], row['경도'], row['이름'], row['주소'], show_info=True)
+        for row in df.head(10).to_dict('records')
+    ]
+    return kakao_map.kakao_map(kakao_key, lat, lng, markers, circles=circles, key='restaurant_map')
+
+
+def _restaurant_id(row: dict) -> str:
+    # place_id when Google gave one; stable across reruns either way
+    place_id = row.get('place_id')
+    return place_id if isinstance(place_id, str) and place_id else f"{row['이름']}|{row['주소']}"
+
+
+def render_itinerary_map(stops: list):
+
+    # Numbered stops joined by a polyline; meals in orange
+    markers = [
+        kakao_map.marker(f"{s['kind']}|{s['name']}", s['lat'], s['lng'], s['name'],
+                         badge=f"{i + 1}. {s['name']}", color='#f08c00' if s['kind'] != '관광지' else '#1c7ed6')
+        for i, s in enumerate(stops)
+    ]
+    kakao_map.kakao_map(kakao_key, stops[0]['lat'], stops[0]['lng'], markers, level=7,
+                        path=[(s['lat'], s['lng']) for s in stops], fit=True, key='itinerary_map')
+
+
+def render_itinerary(places: list, selected_place):
+
+    # Day plan: the chosen attraction first, then the best-ranked others
+    located = [p for p in places if p.lat is not None and p.lng is not None]
+    if len(located) < 2:
+        return
+    st.subheader("🗓 여행 코스 만들기")
+    limit = min(30, len(located))
+    # A slider needs min < max; with two places there is nothing to choose
+    count = st.slider("방문할 관광지 수", 2, limit, min(6, limit), key='itinerary_size') if limit > 2 else 2
+    if st.button("코스 만들기"):
+        others = [p for p in rank_records(located, len(located)) if p.name != selected_place.name]
+        chosen = ([selected_place] if selected_place in located else []) + others
+        stops = [{'name': p.name, 'lat': p.lat, 'lng': p.lng, '주소': p.address} for p in chosen[:count]]
+
+        def meal_options(stop):
+            df = load_restaurants(stop['lat'], stop['lng'], google_key)
+            return [
+                {'name': r['이름'], 'lat': r['위도'], 'lng': r['경도'], '주소': r['주소']}
+                for r in df.head(itinerary.MEAL_CANDIDATES).to_dict('records')
+            ]
+
+        with span('itinerary', stops=len(stops)):
+            st.session_state.itinerary = {
+                'place': selected_place.name,
+                'plan': itinerary.plan_itinerary(stops, meal_options),
+            }
+    saved = st.session_state.get('itinerary')
+    if not saved or saved['place'] != selected_place.name or not saved['plan']['stops']:
+        return
+    plan = saved['plan']
+    st.write(f"총 {len(plan['stops'])}곳 / {plan['days']}일 / 이동 약 {plan['total_km']:.1f}km (직선거리 기준)")
+    st.dataframe(pd.DataFrame(plan['stops'])[['day', 'kind', 'name', 'arrive', 'depart', 'leg_km']].rename(columns={
+        'day': '일차', 'kind': '구분', 'name': '이름', 'arrive': '도착', 'depart': '출발', 'leg_km': '이동(km)',
+    }), hide_index=True)
+    render_itinerary_map(plan['stops'])
+
+
+# -----------------------------------------------------------------------------
+# API 사용량 디버그 패널
+# -----------------------------------------------------------------------------
+def _session_id() -> str:
+
+    # Kept in st.session_state rather than read from the script-run context:
+    # AppTest runs every instance under one fixed session id, and the load
+    # test needs its simulated sessions kept apart
+    if '_session_id' not in st.session_state:
+        st.session_state['_session_id'] = uuid.uuid4().hex
+    return st.session_state['_session_id']
+
+
+def _session_state() -> dict:
+    return sessions.touch(_session_id())
+
+
+def render_usage_panel():
+
+    # Enabled with ?debug=1 or DEBUG_PANEL=1 so regular users never see it
+    if st.query_params.get('debug') != '1' and env('DEBUG_PANEL') != '1':
+        return
+    with st.sidebar.expander("🔧 API 사용량", expanded=True):
+        status = usage.budget_status()
+        st.write(f"세션: {status['session_used']} / {status['session_budget']} 회")
+        st.write(f"오늘: {status['day_used']} / {status['day_budget']} 회")
+        for scope, label in (('rerun', '이번 실행'), ('session', '세션'), ('process', '프로세스')):
+            snapshot = usage.snapshot(scope)
+            if not snapshot:
+                continue
+            st.caption(label)
+            st.dataframe(pd.DataFrame([
+                {
+                    'endpoint': endpoint,
+                    'calls': c['calls'],
+                    'bytes': c['bytes'],
+                    'hits': c['hits'],
+                    'hit ratio': round(hit_ratio(c), 2),
+                    'denied': c['denied'],
+                }
+                for endpoint, c in sorted(snapshot.items())
+            ]), hide_index=True)
+        st.download_button(
+            label="Prometheus metrics",
+            data=usage.to_prometheus(),
+            file_name="metrics.prom",
+            mime='text/plain'
+        )
+    with st.sidebar.expander("🧠 세션 메모리", expanded=False):
+        rows = sessions.sizes()
+        current = _session_id()
+        st.write(f"세션 {len(rows)}개 / 합계 {sum(r['bytes'] for r in rows) / 1024:.1f} KiB")
+        st.caption(f"{sessions.idle_ttl // 60}분 이상 쉬는 세션은 비웁니다 (지금까지 {sessions.evicted}개)")
+        if rows:
+            st.dataframe(pd.DataFrame([
+                dict(r, session=('▶ ' if r['session'] == current else '') + r['session'][:8])
+                for r in rows
+            ]), hide_index=True)
+
 
 def main():
   
     st.set_page_config(page_title="관광지 주변 맛집 추천", layout="wide")
     st.title("📍 관광지 주변 맛집 추천 시스템")
+    usage.begin_rerun(_session_id())
+    try:
+        with span('rerun'), deadline.scope(deadline.RENDER_BUDGET):
+            render_page()
+    finally:
+        if usage.degraded():
+            st.info("ℹ️ API 사용량 한도에 가까워 일부 사진/리뷰를 생략했습니다.")
+        render_usage_panel()
+        usage.write_metrics_file()
+        usage.end_rerun()
+
+
+@st.fragment(run_every=1.0)
+def poll_search():
+
+    # Rerun the whole page only when more attractions have arrived
+    search = _session_state().get('search')
+    if search is None:
+        return
+    if search.version != st.session_state.search_version:
+        st.rerun()
+    st.caption(f"⏳ 관광지 {len(search.places)}곳을 불러왔습니다. 추가 결과를 검색 중…")
+
+
+def render_page():
+
     if not google_key:
         st.error("❗ .env 파일에 'Google_key'가 설정되지 않았습니다.")
         return
-    query = st.text_input("가고 싶은 지역을 입력하세요", "제주")
-    if "places" not in st.session_state:
-        st.session_state.places = None
+    st.session_state.setdefault('query', "제주")
+    query = st.text_input("가고 싶은 지역을 입력하세요", key='query')
+    # Search results live in the shared session store (evicted when idle);
+    # st.session_state only keeps the small UI values
+    state = _session_state()
     if "selected_place" not in st.session_state:
         st.session_state.selected_place = None
-    if st.button("관광지 검색"):
-        st.session_state.places = search_places(query, google_key)
-        st.session_state.selected_place = None
-    if st.session_state.places:
-        display_top_attractions(st.session_state.places)
-        place_names = [p['name'] for p in st.session_state.places]
-        selected = st.selectbox("관광지를 선택하세요", place_names)
+    clicked = st.button("관광지 검색")
+    render_suggestions(query)
+    if clicked or st.session_state.pop('search_requested', False):
+        state['search'], hit = start_search(st.session_state.query, google_key)
+        # An attraction name opens its region with that attraction selected
+        st.session_state.selected_place = hit.label if hit is not None and hit.kind == '관광지' else None
+    search = state.get('search')
+    places = search.places if search else None
+    if search is not None:
+        st.session_state.search_version = search.version
+        if not search.done:
+            poll_search()
+    if places:
+        if search.source == 'sheet' and not search.done:
+            st.caption(f"📄 Google 검색 결과를 기다리는 동안 '{search.query}' 관광지를 전국 관광지 데이터에서 보여줍니다.")
+        elif search.source == 'sheet':
+            st.caption(f"📄 Google 검색에 실패해 '{search.query}' 관광지를 전국 관광지 데이터에서 보여줍니다.")
+        display_top_attractions(search.top)
+        place_names = [p.name for p in places]
+        # Keep the current choice selected while later pages grow the list
+        index = place_names.index(st.session_state.selected_place) \
+            if st.session_state.selected_place in place_names else 0
+        selected = st.selectbox("관광지를 선택하세요", place_names, index=index)
         if st.session_state.selected_place != selected:
             st.session_state.selected_place = selected
-        selected_place = next(
-            (p for p in st.session_state.places if p['name'] == st.session_state.selected_place),
-            None
-        )
+        selected_place = next((p for p in places if p.name == st.session_state.selected_place), None)
         if selected_place is None:
             st.warning("선택한 관광지를 찾을 수 없습니다.")
             return
-        address = selected_place.get('formatted_address')
-        rating = selected_place.get('rating', '없음')
+        place_address = selected_place.address
+        rating = selected_place.rating if selected_place.rating is not None else '없음'
         st.markdown(f"### 🏞 관광지: {st.session_state.selected_place}")
-        st.write(f"📍 주소: {address}")
+        st.write(f"📍 주소: {place_address}")
         st.write(f"⭐ 평점: {rating}")
-        lat, lng = get_lat_lng(address, google_key)
+        # Text Search already returned coordinates; geocode only if they're missing
+        lat, lng = selected_place.lat, selected_place.lng
+        if lat is None:
+            lat, lng = get_lat_lng(place_address, google_key)
         if lat is None:
             st.error("위치 정보를 불러오지 못했습니다.")
             return
-        restaurants = find_nearby_restaurants(lat, lng, google_key)
-        df = pd.DataFrame(restaurants)
-        df = preprocess_restaurant_data(df)
+        df = load_restaurants(lat, lng, google_key)
         display_top_restaurants(df)
         st.subheader("🍽 주변 3km 맛집 Top 10")
         st.dataframe(df[['이름', '주소', '평점']].head(10))
         st.subheader("🗺 지도에서 보기 (카카오맵)")
-        places_js = ""
-        for _, row in df.head(10).iterrows():
-            places_js += (
-                "{"
-                f"name: \"{row['이름']}\"," 
-                f"address: \"{row['주소']}\"," 
-                f"lat: {row['위도']}," 
-                f"lng: {row['경도']}" 
-                "},"
-            )
-        html_code = (
-            "<!DOCTYPE html>"
-            "<html>"
-            "<head>"
-            "<meta charset='utf-8'>"
-            f"<script type='text/javascript' src='//dapi.kakao.com/v2/maps/sdk.js?appkey={kakao_key}'></script>"
-            "</head>"
-            "<body>"
-            "<div id='map' style='width:100%; height:500px;'></div>"
-            "<script>"
-            f"var mapContainer = document.getElementById('map');"
-            f"var mapOption = {{ center: new kakao.maps.LatLng({lat}, {lng}), level: 4 }};"
-            "var map = new kakao.maps.Map(mapContainer, mapOption);"
-            f"var places = [{places_js}];"
-            "places.forEach(function(p) {"
-            "var coords = new kakao.maps.LatLng(p.lat, p.lng);"
-            "var marker = new kakao.maps.Marker({ map: map, position: coords });"
-            "var infowindow = new kakao.maps.InfoWindow({ content: \"<div style='padding:5px; font-size:13px;'>\" + p.name + \"<br>\" + p.address + \"</div>\" });"
-            "infowindow.open(map, marker);"
-            "});"
-            "</script>"
-            "</body>"
-            "</html>"
-        )
-        components.html(html_code, height=550)
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📅 맛집 목록 CSV 다운로드",
-            data=csv,
-            file_name=f"{selected}_맛집목록.csv",
-            mime='text/csv'
-        )
+        with span('render_map'):
+            picked = render_kakao_map(df, lat, lng)
+        # Marker clicks come back from the map component
+        if picked:
+            row = next((r for r in df.head(10).to_dict('records') if _restaurant_id(r) == picked['clicked']), None)
+            if row is not None:
+                st.caption(f"📌 {row['이름']} · {row['주소']} · ⭐ {row['평점']}")
+        render_itinerary(places, selected_place)
+        render_export(df, selected)
+
+
+def render_export(df: pd.DataFrame, selected: str):
+
+    # Files are only generated on request and reused for identical result sets
+    fmt = st.radio("내보내기 형식", list(exporter.FORMATS), horizontal=True, key='export_format')
+    if st.button("📅 맛집 목록 내보내기"):
+        with span('export', format=fmt):
+            st.session_state.export = {
+                'key': exporter.prepare_export(df, fmt),
+                'place': selected,
+                'format': fmt,
+            }
+    export = st.session_state.get('export')
+    if not export or export['place'] != selected or export['format'] != fmt:
+        return
+    data = exporter.cached_export(export['key'])
+    if data is None:
+        return
+    mime, ext = exporter.FORMATS[fmt]
+    st.download_button(
+        label=f"📥 {ext[1:].upper()} 다운로드",
+        data=data,
+        file_name=f"{selected}_맛집목록{ext}",
+        mime=mime
+    )
+
+
+# -----------------------------------------------------------------------------
+# 검색어 자동완성
+# -----------------------------------------------------------------------------
+# Suggestion buttons shown under the search box
+SUGGESTION_COUNT = 6
+
+
+def _pick_suggestion(label: str):
+    st.session_state.query = label
+    st.session_state.search_requested = True
+
+
+def render_suggestions(query: str):
+
+    # Local matches only, so this costs nothing per rerun; picking one searches it
+    suggestions = [e for e in autocomplete.current_index().suggest(query, limit=SUGGESTION_COUNT)
+                   if e.label != query.strip()]
+    if not suggestions:
+        return
+    st.caption("🔎 이런 검색어는 어떠세요?")
+    for col, entry in zip(st.columns(SUGGESTION_COUNT), suggestions):
+        label = entry.label if entry.kind == '지역' else f"{entry.label} · {entry.region}"
+        col.button(label, key=f"suggest:{entry.region}:{entry.label}",
+                   on_click=_pick_suggestion, args=(entry.label,))
+
 
 if __name__ == "__main__":
     main()
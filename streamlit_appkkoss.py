@@ -2,14 +2,12 @@ import streamlit as st
 import pandas as pd
 import requests
 import time
-import os
 import re
-import streamlit.components.v1 as components
-from dotenv import load_dotenv
+from config import env
+import kakao_map
 
-load_dotenv()
-google_key = os.getenv("Google_key")
-kakao_key = os.getenv("KAKAO_KEY")
+google_key = env("Google_key")
+kakao_key = env("KAKAO_KEY")
 
 # ✅ 맛집 데이터 전처리
 def preprocess_restaurant_data(df):
@@ -169,61 +167,13 @@ def main():
         # ✅ 카카오맵 마커 출력
         st.subheader("🗺 지도에서 보기 (카카오맵)")
 
-        # DataFrame → JS 배열 변환 (위도, 경도 포함)
-        places_js = ""
-        for _, row in df.head(10).iterrows():
-            places_js += f'''
-                {{
-                    name: "{row["이름"]}",
-                    address: "{row["주소"]}",
-                    lat: {row["위도"]},
-                    lng: {row["경도"]}
-                }},
-            '''
-
-        html_code = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <script type="text/javascript"
-                src="//dapi.kakao.com/v2/maps/sdk.js?appkey={kakao_key}">
-            </script>
-        </head>
-        <body>
-            <div id="map" style="width:100%; height:500px;"></div>
-
-            <script>
-                var mapContainer = document.getElementById('map');
-                var mapOption = {{
-                    center: new kakao.maps.LatLng({lat}, {lng}),
-                    level: 4
-                }};
-                var map = new kakao.maps.Map(mapContainer, mapOption);
-
-                var places = [{places_js}];
-
-                places.forEach(function(p) {{
-                    var coords = new kakao.maps.LatLng(p.lat, p.lng);
-
-                    var marker = new kakao.maps.Marker({{
-                        map: map,
-                        position: coords
-                    }});
-
-                    var infowindow = new kakao.maps.InfoWindow({{
-                        content: "<div style='padding:5px; font-size:13px;'>"
-                                  + p.name + "<br>" + p.address + "</div>"
-                    }});
-
-                    infowindow.open(map, marker);
-                }});
-            </script>
-        </body>
-        </html>
-        """
-
-        components.html(html_code, height=550)
+        # 지도는 한 번만 로드되고, 관광지를 바꾸면 마커만 교체됩니다
+        markers = [
+            kakao_map.marker(f"{row['이름']}|{row['주소']}", row['위도'], row['경도'],
+                             row['이름'], row['주소'], show_info=True)
+            for row in df.head(10).to_dict('records')
+        ]
+        kakao_map.kakao_map(kakao_key, lat, lng, markers, key='restaurant_map')
 
         # ✅ CSV 다운로드
         csv = df.to_csv(index=False).encode('utf-8')
@@ -0,0 +1,66 @@
+import html
+import streamlit as st
+from tracing import TRACE_FILE, load_traces
+
+# -----------------------------------------------------------------------------
+# 트레이스 워터폴 뷰어 (streamlit run streamlit_trace_viewer.py)
+# -----------------------------------------------------------------------------
+PHASE_COLORS = {
+    'rerun': '#95A5A6',
+    'search_places': '#3498DB',
+    'get_lat_lng': '#1ABC9C',
+    'find_nearby_restaurants': '#2ECC71',
+    'preprocess_restaurant_data': '#9B59B6',
+    'photo_download': '#E67E22',
+    'get_latest_review': '#E74C3C',
+}
+
+
+def render_waterfall(rows: list):
+
+    total_ms = max((r['start_ms'] + r['duration_ms'] for r in rows), default=0) or 1
+    bars = []
+    for r in rows:
+        left = r['start_ms'] / total_ms * 100
+        width = max(r['duration_ms'] / total_ms * 100, 0.3)
+        color = PHASE_COLORS.get(r['name'], '#F1C40F')
+        title = html.escape(f"{r['name']} {r['duration_ms']:.1f} ms {r['attributes']}")
+        bars.append(
+            "<div style='display:flex; align-items:center; height:22px; font-size:12px;'>"
+            f"<div style='width:260px; padding-left:{r['depth'] * 14}px; white-space:nowrap; overflow:hidden;'>"
+            f"{html.escape(r['name'])}</div>"
+            "<div style='flex-grow:1; position:relative; height:14px; background:#F4F4F4;'>"
+            f"<div title='{title}' style='position:absolute; left:{left:.2f}%; width:{width:.2f}%; "
+            f"height:14px; background:{color}; border-radius:3px;'></div></div>"
+            f"<div style='width:80px; text-align:right;'>{r['duration_ms']:.1f} ms</div>"
+            "</div>"
+        )
+    st.markdown("".join(bars), unsafe_allow_html=True)
+
+
+def main():
+
+    st.set_page_config(page_title="Trace viewer", layout="wide")
+    st.title("⏱ 실행 구간 트레이스")
+    path = st.text_input("트레이스 파일", TRACE_FILE)
+    traces = load_traces(path)
+    if not traces:
+        st.info("트레이스가 없습니다. TRACE_ENABLED=1 로 앱을 실행하세요.")
+        return
+    labels = [
+        f"#{i + 1} — {rows[0]['name']} {rows[0]['duration_ms']:.0f} ms ({len(rows)} spans)"
+        for i, rows in enumerate(traces)
+    ]
+    choice = st.selectbox("트레이스 선택 (최신순)", range(len(traces)), format_func=lambda i: labels[i])
+    rows = traces[choice]
+    render_waterfall(rows)
+    # Time per phase, summed over repeated spans (e.g. five photo downloads)
+    totals = {}
+    for r in rows[1:]:
+        totals[r['name']] = totals.get(r['name'], 0) + r['duration_ms']
+    st.subheader("구간별 합계 (ms)")
+    st.bar_chart(totals)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,14 @@ import streamlit as st
 import pandas as pd
 import requests
 import time
-import os
 import re
 import textwrap
-import io
-from PIL import Image
 import streamlit.components.v1 as components
-from dotenv import load_dotenv
+from config import env
 
 # 환경변수에서 API 키를 읽습니다.
-load_dotenv()
-google_key = os.getenv("Google_key")
-kakao_key = os.getenv("KAKAO_KEY")
+google_key = env("Google_key")
+kakao_key = env("KAKAO_KEY")
 
 # 맛집 데이터 전처리
 def preprocess_restaurant_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -109,6 +105,8 @@ def display_top_attractions(places: list):
                 if ref:
                     url = get_place_photo_url(ref, google_key)
                     try:
+                        import io
+                        from PIL import Image
                         resp = requests.get(url)
                         img = Image.open(io.BytesIO(resp.content))
                         img = img.resize((300, 200))
@@ -0,0 +1,435 @@
+import time
+import threading
+import contextvars
+
+import pandas as pd
+import requests
+
+from api_usage import usage
+from tracing import span, traced
+from singleflight import Group
+import deadline
+import providers
+from cache_backend import cache, make_key
+import ranking
+import address
+import records
+import autocomplete
+from config import env
+
+# -----------------------------------------------------------------------------
+# 관광지/맛집 추천 핵심 함수 (Streamlit 앱과 JSON API 가 공유)
+# -----------------------------------------------------------------------------
+# Load environment variables
+google_key = env("Google_key")
+kakao_key = env("KAKAO_KEY")
+
+# Overridable so load tests and local dev can point at a mock upstream
+GOOGLE_API_BASE = env("GOOGLE_API_BASE", "https://maps.googleapis.com").rstrip('/')
+KAKAO_API_BASE = env("KAKAO_API_BASE", "https://dapi.kakao.com").rstrip('/')
+# Responses are reused across reruns for this many seconds
+RESPONSE_TTL = int(env("RESPONSE_TTL", "600"))
+# Google rejects a next_page_token until it becomes valid a moment after issue
+PAGE_TOKEN_DELAY = float(env("PAGE_TOKEN_DELAY", "2.0"))
+# Text Search returns at most three pages of 20 results
+MAX_SEARCH_PAGES = 3
+# Places with fewer user ratings than this are never shown
+MIN_RATINGS = 50
+# Nearby restaurants kept per search, to control API usage
+NEARBY_LIMIT = 15
+# Columns find_nearby_restaurants() rows arrive in
+NEARBY_COLUMNS = ['이름', '주소', '평점', '위도', '경도', 'photo_ref', 'place_id', 'reviews_count']
+# Columns of the table load_restaurants() returns
+RESTAURANT_COLUMNS = ['이름', '주소', '평점', '위도', '경도', 'photo_ref', 'place_id', 'reviews_count',
+                      '시도', '시군구', '상세주소', '주소키', '주소1', '주소2', '점수']
+# Concurrent identical requests from different sessions share one upstream call
+_in_flight = Group()
+
+# -----------------------------------------------------------------------------
+# API 호출 공통 함수 (호출 집계 / 예산 / 캐시)
+# -----------------------------------------------------------------------------
+def _response_key(endpoint: str, url: str, params: dict = None, project=None) -> str:
+    # The API key is part of the params but never needed to tell responses apart
+    return make_key(endpoint, url, sorted((k, v) for k, v in (params or {}).items() if k != 'key'),
+                    project.__name__ if project else None)
+
+
+def google_get(endpoint: str, url: str, params: dict = None, as_json: bool = True, store: bool = True,
+               project=None):
+
+    # project: reduces a good JSON answer to the fields the caller reads; the
+    # reduced form is what gets cached, so hits skip the full payload too.
+    cache_key = _response_key(endpoint, url, params, project)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        usage.record(endpoint, cache_hit=True)
+        return cached
+
+    def call():
+        started = time.monotonic()
+        res = providers.get(endpoint, url, params=params, timeout=deadline.timeout())
+        deadline.latency.record(endpoint, time.monotonic() - started)
+        usage.record(endpoint, nbytes=len(res.content))
+        return res
+
+    # Skip the call instead of spending past the configured budget or deadline.
+    # Checked per caller before joining a shared call, so one session's spent
+    # budget or deadline never answers for another's
+    if deadline.expired() or not usage.allow(endpoint):
+        return None
+
+    def fetch():
+        try:
+            res = deadline.hedged(endpoint, call, lambda: usage.allow(endpoint))
+            payload = res.json() if as_json else None
+        except (requests.RequestException, ValueError):
+            return None
+        if as_json:
+            # Only keep answers worth replaying; INVALID_REQUEST etc. may succeed on retry
+            if payload.get('status', 'OK') not in ('OK', 'ZERO_RESULTS'):
+                return payload
+            if project is not None:
+                payload = project(payload)
+        else:
+            payload = res.content if res.status_code == 200 else None
+        if payload is not None and store:
+            cache.set(cache_key, payload, ttl=RESPONSE_TTL)
+        return payload
+
+    # Waiters stop at their own deadline rather than the leader's
+    payload, shared = _in_flight.do(cache_key, fetch, timeout=deadline.remaining())
+    if shared and payload is None and not deadline.expired() and usage.allow(endpoint):
+        # The leader ran out of its own time or failed: one more try on ours
+        payload, shared = _in_flight.do(cache_key, fetch, timeout=deadline.remaining())
+    if shared and payload is not None:
+        usage.record(endpoint, cache_hit=True)
+    return payload
+
+
+def kakao_get(endpoint: str, url: str, params: dict, api_key: str):
+
+    # Kakao Local is only used by the offline crawl/refresh, which wants fresh
+    # answers, so responses are counted but not cached
+    if not usage.allow(endpoint):
+        return None
+    try:
+        res = providers.get(endpoint, url, params=params, headers={'Authorization': f"KakaoAK {api_key}"},
+                            timeout=deadline.timeout())
+        usage.record(endpoint, nbytes=len(res.content))
+        return res.json() if res.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        return None
+
+
+# -----------------------------------------------------------------------------
+# 응답 축약 (읽는 필드만 남겨 캐시/파싱 비용을 줄임)
+# -----------------------------------------------------------------------------
+# Geocoding, Text Search and Nearby Search take no field mask, so their
+# answers are cut down here; Details asks for its fields upstream instead
+def _first_location(payload: dict) -> dict:
+    results = payload.get('results') or []
+    location = results[0]['geometry']['location'] if results else None
+    return {
+        'status': payload.get('status'),
+        'location': (location['lat'], location['lng']) if location else None,
+    }
+
+
+def _restaurant_rows(payload: dict) -> dict:
+
+    # One NEARBY_COLUMNS tuple per restaurant, built while walking the results
+    rows = []
+    for r in payload.get('results', []):
+        if r.get('user_ratings_total', 0) < MIN_RATINGS:
+            continue
+        location = r['geometry']['location']
+        photos = r.get('photos')
+        rows.append((
+            r.get('name'),
+            r.get('vicinity'),
+            r.get('rating', '없음'),
+            location['lat'],
+            location['lng'],
+            # Keep only the first photo reference and place_id (images and reviews)
+            photos[0].get('photo_reference') if photos else None,
+            r.get('place_id'),
+            r.get('user_ratings_total', 0),
+        ))
+        if len(rows) == NEARBY_LIMIT:
+            break
+    return {'status': payload.get('status'), 'rows': rows}
+
+
+def _place_rows(payload: dict) -> dict:
+    return {
+        'status': payload.get('status'),
+        'next_page_token': payload.get('next_page_token'),
+        'rows': [records.place_row(p) for p in payload.get('results', [])
+                 if p.get('user_ratings_total', 0) >= MIN_RATINGS],
+    }
+
+
+def _latest_review(payload: dict) -> dict:
+    reviews = (payload.get('result') or {}).get('reviews') or []
+    return {
+        'status': payload.get('status'),
+        'review': max(reviews, key=lambda x: x.get('time', 0)) if reviews else None,
+    }
+
+
+# -----------------------------------------------------------------------------
+# 데이터 전처리 함수
+# -----------------------------------------------------------------------------
+@traced()
+def preprocess_restaurant_data(df: pd.DataFrame) -> pd.DataFrame:
+ 
+    # Strip whitespace and remove placeholder names
+    df['이름'] = df['이름'].astype(str).str.strip()
+    df = df[~df['이름'].isin(['-', '없음', '', None])]
+    # Remove duplicates based on the restaurant name
+    df = df.drop_duplicates(subset='이름')
+    # Convert ratings to numeric and drop rows without a rating
+    df['평점'] = pd.to_numeric(df['평점'], errors='coerce')
+    df = df.dropna(subset=['평점'])
+    # Normalise the address once and keep its parsed components
+    # (시도/시군구/상세주소/주소키 and the two card display lines)
+    df = address.add_address_components(df, '주소')
+    # Filter out addresses that are just english letters/numbers/punctuation
+    df = df[~df['주소'].str.fullmatch(r'[A-Za-z0-9 ,.-]+')]
+    df = df[df['주소'].str.strip() != '']
+    df = df.dropna(subset=['주소'])
+    # Sort by rating descending
+    df = df.sort_values(by='평점', ascending=False)
+    return df.reset_index(drop=True)
+
+
+@traced()
+def get_lat_lng(address: str, api_key: str):
+
+    url = f"{GOOGLE_API_BASE}/maps/api/geocode/json"
+    params = {'address': address, 'language': 'ko', 'key': api_key}
+    res = google_get('geocode', url, params, project=_first_location) or {}
+    if res.get('status') == 'OK' and res.get('location'):
+        return tuple(res['location'])
+    return None, None
+
+
+@traced()
+def find_nearby_restaurants(lat: float, lng: float, api_key: str, radius: int = 3000):
+ 
+    url = f"{GOOGLE_API_BASE}/maps/api/place/nearbysearch/json"
+    params = {
+        'location': f'{lat},{lng}',
+        'radius': radius,
+        'type': 'restaurant',
+        'language': 'ko',
+        'key': api_key
+    }
+    res = google_get('nearby', url, params, project=_restaurant_rows) or {}
+    # NEARBY_COLUMNS tuples, already limited to NEARBY_LIMIT places with MIN_RATINGS ratings
+    return res.get('rows', [])
+
+
+@traced()
+def search_places(query: str, api_key: str):
+
+    # First page only; PagedSearch follows the remaining pages in the background
+    return next(iter_search_places(query, api_key), None) or []
+
+
+def iter_search_places(query: str, api_key: str, max_pages: int = MAX_SEARCH_PAGES):
+
+    url = f"{GOOGLE_API_BASE}/maps/api/place/textsearch/json"
+    params = {'query': f"{query} 관광지", 'language': 'ko', 'key': api_key}
+    for page in range(max_pages):
+        with span('search_page', page=page):
+            res = google_get('textsearch', url, params, project=_place_rows) or {}
+            # A fresh token answers INVALID_REQUEST until it activates
+            retries = 0
+            while res.get('status') == 'INVALID_REQUEST' and 'pagetoken' in params and retries < 3:
+                providers.pause(PAGE_TOKEN_DELAY)
+                res = google_get('textsearch', url, params, project=_place_rows) or {}
+                retries += 1
+        if res.get('status') not in ('OK', 'ZERO_RESULTS'):
+            # Skipped (deadline/budget) or failed: None tells callers the list is incomplete
+            yield None
+            return
+        # Already reduced to rated places, one PlaceRecord row each
+        yield records.from_rows(res.get('rows', []))
+        token = res.get('next_page_token')
+        if not token:
+            return
+        params = {'pagetoken': token, 'language': 'ko', 'key': api_key}
+        # Only a token fresh from Google needs time to activate; a cached next page doesn't
+        if cache.get(_response_key('textsearch', url, params, _place_rows)) is None:
+            providers.pause(PAGE_TOKEN_DELAY)
+
+
+@traced()
+def search_all_places(query: str, api_key: str) -> list:
+
+    # Every page at once, for callers that can't show partial results
+    key = make_key('textsearch_all', query)
+    rows = cache.get(key)
+    if rows is not None:
+        return records.from_rows(rows)
+    places = []
+    for page in iter_search_places(query, api_key):
+        if page is None:
+            # Partial answers aren't cached, as in load_restaurants
+            return places
+        places.extend(page)
+    cache.set(key, [p.as_row() for p in places], ttl=RESPONSE_TTL)
+    return places
+
+
+class PagedSearch:
+    """관광지 검색 결과를 페이지 단위로 백그라운드에서 채운다"""
+
+    def __init__(self, query: str, api_key: str, seed=None):
+        self.query = query
+        self.places = []
+        # Top-5 is re-ranked once per page, not on every rerun
+        self.top = []
+        self.done = False
+        # Bumped on every change so the page knows when to rerun
+        self.version = 0
+        # Where the results came from: 'cache', 'sheet' or 'google'
+        self.source = 'cache'
+        # False once a page was skipped or failed; such a list is never cached
+        self._complete = True
+        # True while self.places holds seed() results waiting for the first Google page
+        self._placeholder = False
+        self._lock = threading.Lock()
+        self._cache_key = make_key('textsearch_all', query)
+        cached = cache.get(self._cache_key)
+        if cached is not None:
+            self.places = records.from_rows(cached)
+            self.top = records.rank_records(self.places, 5)
+            self.done = True
+            return
+        pages = iter_search_places(query, api_key)
+        # seed() supplies local results shown while Text Search runs; they have
+        # no place_id or photo, so the first Google page replaces them
+        placeholder = seed() if seed is not None else []
+        if placeholder:
+            self.places = placeholder
+            self.top = records.rank_records(self.places, 5)
+            self.source = 'sheet'
+            self._placeholder = True
+        else:
+            self.source = 'google'
+            # The first page is fetched inline so results show up on this rerun
+            self._add(next(pages, None))
+        # Copy the context so the worker keeps this session's usage scope
+        ctx = contextvars.copy_context()
+        threading.Thread(target=ctx.run, args=(self._follow, pages), daemon=True).start()
+
+    def _add(self, page):
+        if page is None:
+            # A failed first page leaves any placeholder results on screen
+            self._complete = False
+            return
+        with self._lock:
+            # Replace rather than extend so readers always hold a consistent list
+            self.places = page if self._placeholder else self.places + page
+            self._placeholder = False
+            self.source = 'google'
+            self.top = records.rank_records(self.places, 5)
+            self.version += 1
+
+    def _follow(self, pages):
+        # Later pages aren't bound by the deadline of the rerun that started them
+        deadline.clear()
+        try:
+            for page in pages:
+                self._add(page)
+            if self._complete:
+                cache.set(self._cache_key, [p.as_row() for p in self.places], ttl=RESPONSE_TTL)
+        finally:
+            with self._lock:
+                self.done = True
+                self.version += 1
+
+
+def sheet_places(region: str, attraction: str = None) -> list:
+
+    # The region's precomputed Top-k, plus the attraction the user picked so
+    # it stays selected until Google answers
+    try:
+        tables = ranking.load_national_rankings()
+    except (OSError, ImportError, KeyError, ValueError):
+        return []
+    top = tables.top_attractions(region, tables.k)
+    if attraction and (top.empty or attraction not in set(top['관광지명'].astype(str))):
+        rows = tables.region_attractions(region)
+        top = pd.concat([top, rows[rows['관광지명'].astype(str) == attraction]], ignore_index=True)
+    return records.from_sheet(top)
+
+
+def start_search(query: str, api_key: str):
+
+    # Known regions and attractions search under one canonical region name,
+    # so "제주", "제주도" and "제주시" share a cache entry, and a cold region
+    # shows the national sheet until Google answers. Returns (search, matched entry or None).
+    index = autocomplete.current_index()
+    hit = index.resolve(query)
+    if hit is None:
+        return PagedSearch(query, api_key), None
+    # Until the index thread has read the sheet, reading it here would stall the rerun
+    attraction = hit.label if hit.kind == '관광지' else None
+    seed = (lambda: sheet_places(hit.region, attraction)) if index.has_attractions else None
+    return PagedSearch(hit.region, api_key, seed=seed), hit
+
+
+@traced()
+def search_kakao_restaurants(lat: float, lng: float, api_key: str, radius: int = 3000, size: int = 10):
+
+    # Same keyword search the national crawl notebook used
+    url = f"{KAKAO_API_BASE}/v2/local/search/keyword.json"
+    params = {'query': '맛집', 'x': lng, 'y': lat, 'radius': radius, 'size': size}
+    # None (not []) when the call was skipped or failed, so callers can tell it from "no restaurants"
+    res = kakao_get('kakao_keyword', url, params, api_key)
+    return None if res is None else res.get('documents', [])
+
+
+def get_place_photo_url(photo_reference: str, api_key: str, maxwidth: int = 400) -> str:
+
+    return (
+        f"{GOOGLE_API_BASE}/maps/api/place/photo?maxwidth={maxwidth}"
+        f"&photoreference={photo_reference}&key={api_key}"
+    )
+
+
+@traced()
+def get_latest_review(place_id: str, api_key: str, language: str = 'ko'):
+  
+    details_url = f"{GOOGLE_API_BASE}/maps/api/place/details/json"
+    params = {
+        'place_id': place_id,
+        'fields': 'review',
+        'language': language,
+        'key': api_key
+    }
+    # google_get returns None on timeouts and upstream errors
+    res = google_get('details', details_url, params, project=_latest_review) or {}
+    # Only the most recent review is kept from the Details answer
+    return res.get('review')
+
+
+def load_restaurants(lat: float, lng: float, api_key: str) -> pd.DataFrame:
+
+    # Cache the preprocessed table so reruns skip the nearby call, its rate-limit
+    # delay and the preprocessing pass
+    key = make_key('restaurants', round(lat, 6), round(lng, 6))
+    df = cache.get(key)
+    if df is None:
+        restaurants = find_nearby_restaurants(lat, lng, api_key)
+        if not restaurants:
+            # Skipped (budget/deadline) or nothing nearby: empty table, not cached
+            return pd.DataFrame(columns=RESTAURANT_COLUMNS)
+        df = preprocess_restaurant_data(pd.DataFrame(restaurants, columns=NEARBY_COLUMNS))
+        # Order by popularity-weighted rating once, so Top-5/Top-10 are head() lookups
+        df = ranking.add_scores(df, '평점', 'reviews_count')
+        cache.set(key, df, ttl=RESPONSE_TTL)
+    return df
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import threading
+import contextvars
+import functools
+
+from config import env
+
+# -----------------------------------------------------------------------------
+# 경량 트레이싱 설정
+# -----------------------------------------------------------------------------
+ENABLED = env("TRACE_ENABLED") == "1"
+# One OTLP/JSON ExportTraceServiceRequest per line (same layout as the
+# OpenTelemetry collector "file" exporter), one line per rerun.
+TRACE_FILE = env("TRACE_FILE", "traces.jsonl")
+SERVICE_NAME = env("TRACE_SERVICE_NAME", "matour-top5")
+
+_current_span = contextvars.ContextVar('tracing_span', default=None)
+_write_lock = threading.Lock()
+
+
+class _NoopSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key, value):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """하나의 처리 구간 (시작/종료 시각과 속성)"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent', 'attributes',
+                 'start_ns', 'end_ns', 'children', '_lock', '_token')
+
+    def __init__(self, name: str, parent=None, attributes: dict = None):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = dict(attributes or {})
+        self.start_ns = 0
+        self.end_ns = 0
+        self.children = []
+        self._lock = threading.Lock()
+        self._token = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        if self.parent is not None:
+            # Children may finish on worker threads
+            with self.parent._lock:
+                self.parent.children.append(self)
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        _current_span.reset(self._token)
+        if self.parent is None:
+            _export(self)
+        return False
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+def span(name: str, **attributes):
+
+    # Tracing off: hand back a shared no-op object, no allocation or clock read
+    if not ENABLED:
+        return _NOOP
+    return Span(name, _current_span.get(), attributes)
+
+
+def traced(name: str = None):
+
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(span_name, _current_span.get()):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# -----------------------------------------------------------------------------
+# OTLP/JSON 파일 출력
+# -----------------------------------------------------------------------------
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _to_otlp(root: Span) -> dict:
+    spans = []
+    for s in root.walk():
+        spans.append({
+            'traceId': s.trace_id,
+            'spanId': s.span_id,
+            'parentSpanId': s.parent.span_id if s.parent else '',
+            'name': s.name,
+            'kind': 1,
+            'startTimeUnixNano': str(s.start_ns),
+            'endTimeUnixNano': str(s.end_ns or s.start_ns),
+            'attributes': [{'key': k, 'value': _otlp_value(v)} for k, v in s.attributes.items()],
+        })
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}}]},
+            'scopeSpans': [{'scope': {'name': 'tracing'}, 'spans': spans}],
+        }]
+    }
+
+
+def _export(root: Span):
+    line = json.dumps(_to_otlp(root), ensure_ascii=False)
+    with _write_lock:
+        with open(TRACE_FILE, 'a', encoding='utf-8') as f:
+            f.write(line + "\n")
+
+
+def load_traces(path: str = TRACE_FILE, limit: int = 50) -> list:
+
+    # Returns the newest traces first as flat span dicts with millisecond offsets
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        lines = f.readlines()[-limit:]
+    traces = []
+    for line in reversed(lines):
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            continue
+        spans = [
+            s
+            for resource in payload.get('resourceSpans', [])
+            for scope in resource.get('scopeSpans', [])
+            for s in scope.get('spans', [])
+        ]
+        if not spans:
+            continue
+        t0 = min(int(s['startTimeUnixNano']) for s in spans)
+        depth = {}
+        rows = []
+        for s in spans:
+            parent = s.get('parentSpanId')
+            depth[s['spanId']] = depth.get(parent, -1) + 1 if parent else 0
+            rows.append({
+                'name': s['name'],
+                'depth': depth[s['spanId']],
+                'start_ms': (int(s['startTimeUnixNano']) - t0) / 1e6,
+                'duration_ms': (int(s['endTimeUnixNano']) - int(s['startTimeUnixNano'])) / 1e6,
+                'attributes': {a['key']: next(iter(a['value'].values())) for a in s.get('attributes', [])},
+            })
+        traces.append(rows)
+    return traces